@@ -1,65 +1,71 @@
-import random
-import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import session_cipher
+from arithmetic import get_backend
+from oaep import max_message_length, oaep_decode, oaep_encode
+from primality import DEFAULT_ROUNDS, find_prime, is_probable_prime
+from tracing import DEMO_MODE, EXECUTION_MODES, PRODUCTION_MODE, Trace
+
+# How encrypt_message turns text into RSA operations
+CHAR_MODE = 'char'      # One exponentiation per character (teaching mode)
+BLOCK_MODE = 'block'    # UTF-8 bytes packed into OAEP-padded blocks
+HYBRID_MODE = 'hybrid'  # Session-key encryption with only the key RSA-wrapped
+ENCRYPTION_MODES = (CHAR_MODE, BLOCK_MODE, HYBRID_MODE)
+
+# Receivers below this count are wrapped in-process; a worker pool costs more to start
+PARALLEL_WRAP_THRESHOLD = 512
 
 class RSAAlgorithm:
-    def _init_(self):
+    def __init__(self, execution_mode=DEMO_MODE, backend=None):
         """Initialize RSA Algorithm class"""
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
+        
         self.public_key = None
         self.private_key = None
+        self.execution_mode = execution_mode
+        self.backend = get_backend(backend)  # Modular arithmetic implementation
+    
+    def new_trace(self):
+        """Start a step-by-step trace, or None when tracing is off"""
+        if self.execution_mode == DEMO_MODE:
+            return Trace(echo=True)
+        return None
     
-    def is_prime(self, n):
-        """Check if a number is prime using trial division"""
-        if n < 2:
-            return False
-        if n == 2:
-            return True
-        if n % 2 == 0:
-            return False
-        
-        # Check odd divisors up to sqrt(n)
-        for i in range(3, int(math.sqrt(n)) + 1, 2):
-            if n % i == 0:
-                return False
-        return True
+    def is_prime(self, n, rounds=DEFAULT_ROUNDS):
+        """Check if a number is prime using sieve pre-filtering and Miller-Rabin"""
+        return is_probable_prime(n, rounds)
     
     def generate_prime(self, bits=8):
         """Generate a random prime number with specified bit length"""
-        while True:
-            # Generate random number in range
-            num = random.randint(2*(bits-1), 2*bits - 1)
-            if self.is_prime(num):
-                return num
+        # Sieve forward from one random odd start instead of redrawing
+        return find_prime(bits)
     
     def gcd(self, a, b):
-        """Calculate Greatest Common Divisor using Euclidean algorithm"""
-        while b:
-            a, b = b, a % b
-        return a
+        """Calculate Greatest Common Divisor"""
+        return self.backend.gcd(a, b)
     
     def extended_gcd(self, a, b):
-        """Extended Euclidean Algorithm to find modular inverse"""
-        if a == 0:
-            return b, 0, 1
-        
-        gcd, x1, y1 = self.extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        
-        return gcd, x, y
+        """Extended Euclidean Algorithm, returns (gcd, x, y) with ax + by = gcd"""
+        return self.backend.extended_gcd(a, b)
     
     def mod_inverse(self, e, phi_n):
         """Calculate modular multiplicative inverse"""
-        gcd, x, y = self.extended_gcd(e, phi_n)
-        if gcd != 1:
-            raise ValueError("Modular inverse does not exist")
-        return (x % phi_n + phi_n) % phi_n
+        return self.backend.mod_inverse(e, phi_n)
     
-    def generate_keypair(self, bits=8):
+    def generate_keypair(self, bits=8, trace=None):
         """Generate RSA public and private key pair"""
-        print("=== RSA Key Generation Process ===")
+        if trace is None:
+            trace = self.new_trace()
+        
+        if trace:
+            trace.begin("RSA Key Generation Process")
         
         # Step 1: Generate two distinct prime numbers
-        print("Step 1: Generating prime numbers...")
+        if trace:
+            trace.step("Step 1: Generating prime numbers...")
         p = self.generate_prime(bits)
         q = self.generate_prime(bits)
         
@@ -67,19 +73,23 @@ class RSAAlgorithm:
         while p == q:
             q = self.generate_prime(bits)
         
-        print(f"Prime p = {p}")
-        print(f"Prime q = {q}")
+        if trace:
+            trace.step(f"Prime p = {p}")
+            trace.step(f"Prime q = {q}")
         
         # Step 2: Calculate n = p * q
         n = p * q
-        print(f"Step 2: n = p × q = {p} × {q} = {n}")
+        if trace:
+            trace.step(f"Step 2: n = p × q = {p} × {q} = {n}")
         
         # Step 3: Calculate Euler's totient function φ(n) = (p-1)(q-1)
         phi_n = (p - 1) * (q - 1)
-        print(f"Step 3: φ(n) = (p-1)(q-1) = ({p}-1)({q}-1) = {phi_n}")
+        if trace:
+            trace.step(f"Step 3: φ(n) = (p-1)(q-1) = ({p}-1)({q}-1) = {phi_n}")
         
         # Step 4: Choose e such that 1 < e < φ(n) and gcd(e, φ(n)) = 1
-        print("Step 4: Choosing public exponent e...")
+        if trace:
+            trace.step("Step 4: Choosing public exponent e...")
         e = 65537  # Common choice for e
         
         # If e is too large or not coprime, find a suitable e
@@ -88,43 +98,38 @@ class RSAAlgorithm:
             while e < phi_n and self.gcd(e, phi_n) != 1:
                 e += 2
         
-        print(f"Public exponent e = {e}")
-        print(f"Verification: gcd({e}, {phi_n}) = {self.gcd(e, phi_n)}")
+        if trace:
+            trace.step(f"Public exponent e = {e}")
+            trace.step(f"Verification: gcd({e}, {phi_n}) = {self.gcd(e, phi_n)}")
         
         # Step 5: Calculate d, the modular multiplicative inverse of e
-        print("Step 5: Calculating private exponent d...")
+        if trace:
+            trace.step("Step 5: Calculating private exponent d...")
         d = self.mod_inverse(e, phi_n)
-        print(f"Private exponent d = {d}")
-        print(f"Verification: (e × d) mod φ(n) = ({e} × {d}) mod {phi_n} = {(e * d) % phi_n}")
+        if trace:
+            trace.step(f"Private exponent d = {d}")
+            trace.step(f"Verification: (e × d) mod φ(n) = ({e} × {d}) mod {phi_n} = {(e * d) % phi_n}")
         
         # Store keys
         self.public_key = (n, e)
         self.private_key = (n, d)
         
-        print(f"\n=== Generated Keys ===")
-        print(f"Public Key (n, e) = ({n}, {e})")
-        print(f"Private Key (n, d) = ({n}, {d})")
+        if trace:
+            trace.begin("Generated Keys")
+            trace.step(f"Public Key (n, e) = ({n}, {e})")
+            trace.step(f"Private Key (n, d) = ({n}, {d})")
         
         return self.public_key, self.private_key
     
     def power_mod(self, base, exp, mod):
-        """Fast modular exponentiation using binary method"""
-        result = 1
-        base = base % mod
-        
-        while exp > 0:
-            # If exp is odd, multiply base with result
-            if exp % 2 == 1:
-                result = (result * base) % mod
-            
-            # exp must be even now
-            exp = exp >> 1  # exp = exp / 2
-            base = (base * base) % mod
-        
-        return result
+        """Modular exponentiation using the configured arithmetic backend"""
+        return self.backend.power_mod(base, exp, mod)
     
-    def encrypt(self, message, public_key):
+    def encrypt(self, message, public_key, trace=None):
         """Encrypt message using RSA public key"""
+        if trace is None:
+            trace = self.new_trace()
+        
         n, e = public_key
         
         if isinstance(message, str):
@@ -134,8 +139,9 @@ class RSAAlgorithm:
             message_nums = [message]
         
         encrypted = []
-        print(f"\n=== Encryption Process ===")
-        print(f"Public Key: (n={n}, e={e})")
+        if trace:
+            trace.begin("Encryption Process")
+            trace.step(f"Public Key: (n={n}, e={e})")
         
         for i, num in enumerate(message_nums):
             if num >= n:
@@ -146,54 +152,185 @@ class RSAAlgorithm:
             encrypted.append(cipher)
             
             if isinstance(message, str):
-                print(f"'{message[i]}' (ASCII {num}) -> {num}^{e} mod {n} = {cipher}")
+                if trace:
+                    trace.step(f"'{message[i]}' (ASCII {num}) -> {num}^{e} mod {n} = {cipher}")
             else:
-                print(f"Message {num} -> {num}^{e} mod {n} = {cipher}")
+                if trace:
+                    trace.step(f"Message {num} -> {num}^{e} mod {n} = {cipher}")
         
         return encrypted
     
-    def decrypt(self, ciphertext, private_key):
+    def decrypt(self, ciphertext, private_key, trace=None):
         """Decrypt ciphertext using RSA private key"""
+        if trace is None:
+            trace = self.new_trace()
+        
         n, d = private_key
         
         decrypted = []
-        print(f"\n=== Decryption Process ===")
-        print(f"Private Key: (n={n}, d={d})")
+        if trace:
+            trace.begin("Decryption Process")
+            trace.step(f"Private Key: (n={n}, d={d})")
         
         for i, cipher in enumerate(ciphertext):
             # Decrypt: m = c^d mod n
             message = self.power_mod(cipher, d, n)
             decrypted.append(message)
-            print(f"Cipher {cipher} -> {cipher}^{d} mod {n} = {message}")
+            if trace:
+                trace.step(f"Cipher {cipher} -> {cipher}^{d} mod {n} = {message}")
         
         return decrypted
     
-    def encrypt_message(self, message, public_key):
-        """Encrypt a string message"""
-        encrypted = self.encrypt(message, public_key)
+    def _encrypt_block(self, chunk, n, e, key_bytes):
+        """Pad one chunk with OAEP and encrypt it as a single integer"""
+        padded = oaep_encode(chunk, key_bytes)
+        return self.power_mod(int.from_bytes(padded, 'big'), e, n)
+    
+    def _decrypt_block(self, cipher, n, d, key_bytes):
+        """Decrypt one integer block and strip its OAEP padding"""
+        padded = self.power_mod(cipher, d, n).to_bytes(key_bytes, 'big')
+        return oaep_decode(padded, key_bytes)
+    
+    def encrypt_bytes(self, data, public_key, trace=None):
+        """Encrypt bytes in OAEP-padded blocks as large as the modulus allows"""
+        if trace is None:
+            trace = self.new_trace()
+        
+        n, e = public_key
+        key_bytes = (n.bit_length() + 7) // 8
+        block_size = max_message_length(key_bytes)
+        if block_size < 1:
+            raise ValueError("Key too small for block encryption; the modulus needs at least 536 bits")
+        
+        blocks = [self._encrypt_block(data[offset:offset + block_size], n, e, key_bytes)
+                  for offset in range(0, len(data), block_size)]
+        
+        if trace:
+            trace.begin("Block Encryption Process")
+            trace.step(f"Public Key: (n={n}, e={e})")
+            trace.step(f"{len(data)} bytes packed into {len(blocks)} OAEP blocks "
+                       f"of up to {block_size} bytes")
+        
+        return blocks
+    
+    def decrypt_bytes(self, blocks, private_key, trace=None):
+        """Decrypt blocks produced by encrypt_bytes back into bytes"""
+        if trace is None:
+            trace = self.new_trace()
+        
+        n, d = private_key
+        key_bytes = (n.bit_length() + 7) // 8
+        data = b''.join(self._decrypt_block(cipher, n, d, key_bytes) for cipher in blocks)
+        
+        if trace:
+            trace.begin("Block Decryption Process")
+            trace.step(f"{len(blocks)} OAEP blocks decrypted into {len(data)} bytes")
+        
+        return data
+    
+    def wrap_session_key(self, session_key, public_key):
+        """RSA-encrypt a symmetric session key as one OAEP block"""
+        n, e = public_key
+        key_bytes = (n.bit_length() + 7) // 8
+        if max_message_length(key_bytes) < len(session_key):
+            raise ValueError("Key too small to wrap a session key; the modulus needs at least 784 bits")
+        return self._encrypt_block(session_key, n, e, key_bytes)
+    
+    def unwrap_session_key(self, wrapped_key, private_key):
+        """Recover a session key wrapped by wrap_session_key"""
+        n, d = private_key
+        return self._decrypt_block(wrapped_key, n, d, (n.bit_length() + 7) // 8)
+    
+    def encrypt_hybrid(self, data, public_key, trace=None):
+        """Encrypt bytes with a fresh session key and RSA-wrap only that key
+
+        Costs one RSA operation however long the message is. Needs the
+        optional cryptography package for AES-GCM; raises CipherUnavailable
+        without it.
+        """
+        session_cipher.require()
+        if trace is None:
+            trace = self.new_trace()
+        
+        session_key = session_cipher.generate_key()
+        envelope = {
+            'wrapped_key': self.wrap_session_key(session_key, public_key),
+            'ciphertext': session_cipher.encrypt(session_key, data)
+        }
+        
+        if trace:
+            trace.begin("Hybrid Encryption Process")
+            trace.step(f"Random {len(session_key)}-byte session key wrapped with RSA-OAEP: "
+                       f"{envelope['wrapped_key']}")
+            trace.step(f"{len(data)} bytes encrypted with the session key")
+        
+        return envelope
+    
+    def decrypt_hybrid(self, envelope, private_key, trace=None):
+        """Unwrap the session key and decrypt a message from encrypt_hybrid"""
+        session_cipher.require()
+        if trace is None:
+            trace = self.new_trace()
+        
+        session_key = self.unwrap_session_key(envelope['wrapped_key'], private_key)
+        data = session_cipher.decrypt(session_key, envelope['ciphertext'])
+        
+        if trace:
+            trace.begin("Hybrid Decryption Process")
+            trace.step("Session key unwrapped with the RSA private key")
+            trace.step(f"{len(data)} bytes decrypted and authenticated")
+        
+        return data
+    
+    def encrypt_message(self, message, public_key, trace=None, mode=CHAR_MODE):
+        """Encrypt a string message
+
+        CHAR_MODE encrypts each character separately and needs only tiny
+        keys. BLOCK_MODE and HYBRID_MODE encrypt the UTF-8 bytes with
+        padding and need a modulus of at least 536 and 784 bits respectively.
+        """
+        if mode == BLOCK_MODE:
+            return self.encrypt_bytes(message.encode('utf-8'), public_key, trace)
+        if mode == HYBRID_MODE:
+            return self.encrypt_hybrid(message.encode('utf-8'), public_key, trace)
+        if mode != CHAR_MODE:
+            raise ValueError(f"Unknown encryption mode: {mode}")
+        encrypted = self.encrypt(message, public_key, trace)
         return encrypted
     
-    def decrypt_message(self, ciphertext, private_key):
+    def decrypt_message(self, ciphertext, private_key, trace=None, mode=CHAR_MODE):
         """Decrypt to get original string message"""
-        decrypted_nums = self.decrypt(ciphertext, private_key)
+        if mode == BLOCK_MODE:
+            return self.decrypt_bytes(ciphertext, private_key, trace).decode('utf-8')
+        if mode == HYBRID_MODE:
+            return self.decrypt_hybrid(ciphertext, private_key, trace).decode('utf-8')
+        if mode != CHAR_MODE:
+            raise ValueError(f"Unknown encryption mode: {mode}")
+        decrypted_nums = self.decrypt(ciphertext, private_key, trace)
         message = ''.join([chr(num) for num in decrypted_nums])
         return message
 
+def wrap_session_key_for(public_keys, session_key, backend_name=None):
+    """Wrap one session key for each public key (runs in a worker process)"""
+    rsa = RSAAlgorithm(PRODUCTION_MODE, backend_name)
+    return [rsa.wrap_session_key(session_key, public_key) for public_key in public_keys]
+
 class SecureMessagingDemo:
     """Interactive demo for secure messaging between two users"""
     
-    def _init_(self):
-        self.rsa = RSAAlgorithm()
+    def __init__(self, execution_mode=DEMO_MODE):
+        self.rsa = RSAAlgorithm(execution_mode)
         self.users = {}
+        self.execution_mode = execution_mode
     
     def create_user(self, username, bits=8):
         """Create a new user with RSA key pair"""
-        print(f"\n{'='*50}")
-        print(f"Creating User: {username}")
-        print(f"{'='*50}")
+        trace = self.rsa.new_trace()
+        if trace:
+            trace.begin(f"Creating User: {username}")
         
-        user_rsa = RSAAlgorithm()
-        public_key, private_key = user_rsa.generate_keypair(bits)
+        user_rsa = RSAAlgorithm(self.execution_mode)
+        public_key, private_key = user_rsa.generate_keypair(bits, trace)
         
         self.users[username] = {
             'rsa': user_rsa,
@@ -205,9 +342,9 @@ class SecureMessagingDemo:
     
     def send_secure_message(self, sender, receiver, message):
         """Send encrypted message from sender to receiver"""
-        print(f"\n{'='*60}")
-        print(f"SECURE MESSAGE: {sender} → {receiver}")
-        print(f"{'='*60}")
+        trace = self.rsa.new_trace()
+        if trace:
+            trace.begin(f"SECURE MESSAGE: {sender} → {receiver}")
         
         if sender not in self.users or receiver not in self.users:
             print("Error: Both users must be created first!")
@@ -217,21 +354,23 @@ class SecureMessagingDemo:
         receiver_public_key = self.users[receiver]['public_key']
         sender_rsa = self.users[sender]['rsa']
         
-        print(f"Original Message: '{message}'")
-        print(f"Using {receiver}'s public key for encryption...")
+        if trace:
+            trace.step(f"Original Message: '{message}'")
+            trace.step(f"Using {receiver}'s public key for encryption...")
         
         # Encrypt message
-        encrypted_message = sender_rsa.encrypt_message(message, receiver_public_key)
+        encrypted_message = sender_rsa.encrypt_message(message, receiver_public_key, trace)
         
-        print(f"Encrypted Message: {encrypted_message}")
+        if trace:
+            trace.step(f"Encrypted Message: {encrypted_message}")
         
         return encrypted_message
     
     def receive_secure_message(self, receiver, encrypted_message):
         """Decrypt received message using receiver's private key"""
-        print(f"\n{'='*60}")
-        print(f"MESSAGE DECRYPTION BY: {receiver}")
-        print(f"{'='*60}")
+        trace = self.rsa.new_trace()
+        if trace:
+            trace.begin(f"MESSAGE DECRYPTION BY: {receiver}")
         
         if receiver not in self.users:
             print("Error: Receiver not found!")
@@ -241,15 +380,105 @@ class SecureMessagingDemo:
         receiver_private_key = self.users[receiver]['private_key']
         receiver_rsa = self.users[receiver]['rsa']
         
-        print(f"Encrypted Message Received: {encrypted_message}")
-        print(f"Using {receiver}'s private key for decryption...")
+        if trace:
+            trace.step(f"Encrypted Message Received: {encrypted_message}")
+            trace.step(f"Using {receiver}'s private key for decryption...")
         
         # Decrypt message
-        decrypted_message = receiver_rsa.decrypt_message(encrypted_message, receiver_private_key)
+        decrypted_message = receiver_rsa.decrypt_message(encrypted_message, receiver_private_key, trace)
         
-        print(f"Decrypted Message: '{decrypted_message}'")
+        if trace:
+            trace.step(f"Decrypted Message: '{decrypted_message}'")
         
         return decrypted_message
+    
+    def wrap_for_receivers(self, session_key, public_keys, max_workers=None):
+        """Wrap a session key for every public key, in parallel for large lists"""
+        workers = max_workers or os.cpu_count() or 1
+        if workers == 1 or len(public_keys) < PARALLEL_WRAP_THRESHOLD:
+            return [self.rsa.wrap_session_key(session_key, public_key) for public_key in public_keys]
+        
+        # A few chunks per worker keeps the pool busy without per-key task overhead
+        chunk_size = -(-len(public_keys) // (workers * 4))
+        chunks = [public_keys[i:i + chunk_size] for i in range(0, len(public_keys), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            wrapped_chunks = executor.map(
+                wrap_session_key_for, chunks, repeat(session_key), repeat(self.rsa.backend.name)
+            )
+            return [wrapped for chunk in wrapped_chunks for wrapped in chunk]
+    
+    def broadcast(self, sender, receivers, message, max_workers=None):
+        """Send one encrypted message to many receivers
+
+        The message is encrypted once with a random session key, and only
+        that key is RSA-wrapped for each receiver. Returns the shared
+        ciphertext with one key envelope per receiver:
+
+            {'sender': ..., 'ciphertext': bytes, 'envelopes': {receiver: wrapped key}}
+        """
+        trace = self.rsa.new_trace()
+        if trace:
+            trace.begin(f"BROADCAST: {sender} → {len(receivers)} receivers")
+        
+        missing = [username for username in [sender, *receivers] if username not in self.users]
+        if missing:
+            print(f"Error: Users not found: {', '.join(missing)}")
+            return None
+        
+        if not session_cipher.AVAILABLE:
+            print("Error: Broadcast needs the optional 'cryptography' package!")
+            return None
+        
+        receivers = list(dict.fromkeys(receivers))  # Drop duplicates, keep order
+        session_key = session_cipher.generate_key()
+        ciphertext = session_cipher.encrypt(session_key, message.encode('utf-8'))
+        
+        if trace:
+            trace.step(f"Original Message: '{message}'")
+            trace.step(f"Message encrypted once with a random session key ({len(ciphertext)} bytes)")
+        
+        public_keys = [self.users[receiver]['public_key'] for receiver in receivers]
+        envelopes = dict(zip(receivers, self.wrap_for_receivers(session_key, public_keys, max_workers)))
+        
+        if trace:
+            for receiver, wrapped_key in envelopes.items():
+                trace.step(f"Session key wrapped with {receiver}'s public key: {wrapped_key}")
+        
+        return {
+            'sender': sender,
+            'ciphertext': ciphertext,
+            'envelopes': envelopes
+        }
+    
+    def receive_broadcast(self, receiver, broadcast):
+        """Decrypt a broadcast message using the receiver's own key envelope"""
+        trace = self.rsa.new_trace()
+        if trace:
+            trace.begin(f"BROADCAST DECRYPTION BY: {receiver}")
+        
+        if receiver not in self.users:
+            print("Error: Receiver not found!")
+            return None
+        
+        wrapped_key = broadcast['envelopes'].get(receiver)
+        if wrapped_key is None:
+            print(f"Error: Broadcast has no key envelope for {receiver}!")
+            return None
+        
+        if not session_cipher.AVAILABLE:
+            print("Error: Broadcast needs the optional 'cryptography' package!")
+            return None
+        
+        envelope = {'wrapped_key': wrapped_key, 'ciphertext': broadcast['ciphertext']}
+        receiver_rsa = self.users[receiver]['rsa']
+        message = receiver_rsa.decrypt_hybrid(
+            envelope, self.users[receiver]['private_key'], trace
+        ).decode('utf-8')
+        
+        if trace:
+            trace.step(f"Decrypted Message: '{message}'")
+        
+        return message
 
 def main():
     """Main function to demonstrate RSA algorithm"""
@@ -308,5 +537,5 @@ def main():
     print("✅ Only Bob can decrypt messages meant for him")
     print("✅ Alice's private key remains secure")
 
-if _name_ == "_main_":
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
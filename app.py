@@ -1,104 +1,136 @@
-from flask import Flask, request, jsonify, render_template
+from flask import (Blueprint, Flask, Response, current_app, g, jsonify, render_template,
+                   request, stream_with_context)
 from flask_cors import CORS
+from werkzeug.local import LocalProxy
+import base64
 import hashlib
-import random
-import math
 import json
+import os
+import threading
+import time
 
-app = Flask(__name__)
-CORS(app)
+from arithmetic import get_backend
+from key_pool import KeyPool
+from key_store import InMemoryKeyStore, KeyRecord, key_store_from_env
+from merkle import MerkleTree, leaf_hash, root_digest, root_from_proof
+from metrics import NULL_TIMER, Metrics
+from primality import DEFAULT_ROUNDS, find_prime, is_probable_prime
+from result_cache import VerificationResultCache
+from signing_pool import SigningPool, SigningPoolBusy
+from tracing import DEMO_MODE, EXECUTION_MODES, Trace, execution_mode_from_env
+from verifier_cache import VerifierCache, key_fingerprint
+from wire_format import MEDIA_TYPE as BINARY_MEDIA_TYPE, decode_message, encode_message
+
+# Digest algorithms accepted from clients that hash documents themselves
+DIGEST_ALGORITHMS = {
+    name: hashlib.new(name).digest_size for name in ('sha256', 'sha384', 'sha512', 'blake2b')
+}
+
+# DER DigestInfo headers (RFC 8017, section 9.2) put in front of a digest
+# before signing, so a signature only verifies under the algorithm it was
+# made for. SHA-256 digests are signed bare, as sign_message signs its hash;
+# no prefixed value can equal a bare 32-byte hash.
+DIGEST_INFO_PREFIXES = {
+    'sha384': bytes.fromhex('3041300d060960864801650304020205000430'),
+    'sha512': bytes.fromhex('3051300d060960864801650304020305000440'),
+    'blake2b': bytes.fromhex('3053300f060b2b060104018d3a0c02011005000440'),
+}
 
 class RSADigitalSignature:
     """RSA Digital Signature implementation from scratch"""
     
-    def __init__(self):
-        self.users = {}  # Store user key pairs
-    
-    def is_prime(self, n):
-        """Check if a number is prime using trial division"""
-        if n < 2:
-            return False
-        if n == 2:
-            return True
-        if n % 2 == 0:
-            return False
+    def __init__(self, key_pool=None, execution_mode=DEMO_MODE, backend=None,
+                 key_store=None, verifier_cache_size=1024, result_cache=None,
+                 signing_pool=None, metrics=None):
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
         
-        # Check odd divisors up to sqrt(n)
-        for i in range(3, int(math.sqrt(n)) + 1, 2):
-            if n % i == 0:
-                return False
-        return True
+        # Store user key pairs (a KeyStore, in memory unless one is given)
+        self.users = key_store if key_store is not None else InMemoryKeyStore()
+        self.key_pool = key_pool  # Optional pool of pre-generated primes
+        self.execution_mode = execution_mode
+        self.backend = get_backend(backend)  # Modular arithmetic implementation
+        self.verifier_cache = VerifierCache(self.backend, verifier_cache_size)
+        self.result_cache = result_cache  # Optional VerificationResultCache
+        self.signing_pool = signing_pool  # Optional multi-process SigningPool
+        self.metrics = metrics  # Optional Metrics receiving per-stage timings
+    
+    def new_trace(self):
+        """Start a step-by-step trace for one operation, or None when tracing is off
+
+        In demo mode every step is collected and echoed to the console. In
+        production mode no trace exists, so no step messages are formatted.
+        """
+        if self.execution_mode == DEMO_MODE:
+            return Trace(echo=True)
+        return None
+    
+    def stage(self, operation, stage):
+        """Time one stage of an operation, or do nothing when metrics are off"""
+        if self.metrics is None:
+            return NULL_TIMER
+        return self.metrics.stage(operation, stage)
+    
+    def is_prime(self, n, rounds=DEFAULT_ROUNDS):
+        """Check if a number is prime using sieve pre-filtering and Miller-Rabin"""
+        return is_probable_prime(n, rounds)
     
     def generate_prime(self, bits=10):
         """Generate a random prime number with specified bit length"""
-        while True:
-            # Generate random number in range
-            num = random.randint(2**(bits-1), 2**bits - 1)
-            if self.is_prime(num):
-                return num
+        # Sieve forward from one random odd start instead of redrawing
+        return find_prime(bits)
     
     def gcd(self, a, b):
-        """Calculate Greatest Common Divisor using Euclidean algorithm"""
-        while b:
-            a, b = b, a % b
-        return a
+        """Calculate Greatest Common Divisor"""
+        return self.backend.gcd(a, b)
     
     def extended_gcd(self, a, b):
-        """Extended Euclidean Algorithm to find modular inverse"""
-        if a == 0:
-            return b, 0, 1
-        
-        gcd, x1, y1 = self.extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        
-        return gcd, x, y
+        """Extended Euclidean Algorithm, returns (gcd, x, y) with ax + by = gcd"""
+        return self.backend.extended_gcd(a, b)
     
     def mod_inverse(self, e, phi_n):
         """Calculate modular multiplicative inverse"""
-        gcd, x, y = self.extended_gcd(e, phi_n)
-        if gcd != 1:
-            raise ValueError("Modular inverse does not exist")
-        return (x % phi_n + phi_n) % phi_n
+        return self.backend.mod_inverse(e, phi_n)
     
     def power_mod(self, base, exp, mod):
-        """Fast modular exponentiation using binary method"""
-        result = 1
-        base = base % mod
-        
-        while exp > 0:
-            # If exp is odd, multiply base with result
-            if exp % 2 == 1:
-                result = (result * base) % mod
-            
-            # exp must be even now
-            exp = exp >> 1  # exp = exp / 2
-            base = (base * base) % mod
-        
-        return result
-    
-    def generate_keypair(self, username, bits=10):
+        """Modular exponentiation using the configured arithmetic backend"""
+        return self.backend.power_mod(base, exp, mod)
+    
+    def generate_keypair(self, username, bits=10, trace=None):
         """Generate RSA public and private key pair for digital signatures"""
-        print(f"=== Generating RSA Keys for {username} ===")
+        if trace is None:
+            trace = self.new_trace()
         
-        # Step 1: Generate two distinct prime numbers
-        p = self.generate_prime(bits)
-        q = self.generate_prime(bits)
+        if trace:
+            trace.begin(f"Generating RSA Keys for {username}")
         
-        # Ensure p and q are different
-        while p == q:
-            q = self.generate_prime(bits)
+        # Step 1: Generate two distinct prime numbers, using a pre-generated
+        # pair from the background pool when one is ready
+        with self.stage('generate_keypair', 'primes'):
+            primes = self.key_pool.take(bits) if self.key_pool else None
+            if primes:
+                p, q = primes
+            else:
+                p = self.generate_prime(bits)
+                q = self.generate_prime(bits)
+                
+                # Ensure p and q are different
+                while p == q:
+                    q = self.generate_prime(bits)
         
-        print(f"Prime p = {p}")
-        print(f"Prime q = {q}")
+        if trace:
+            trace.step(f"Prime p = {p}")
+            trace.step(f"Prime q = {q}")
         
         # Step 2: Calculate n = p * q
         n = p * q
-        print(f"n = p × q = {p} × {q} = {n}")
+        if trace:
+            trace.step(f"n = p × q = {p} × {q} = {n}")
         
         # Step 3: Calculate Euler's totient function φ(n) = (p-1)(q-1)
         phi_n = (p - 1) * (q - 1)
-        print(f"φ(n) = (p-1)(q-1) = ({p}-1)({q}-1) = {phi_n}")
+        if trace:
+            trace.step(f"φ(n) = (p-1)(q-1) = ({p}-1)({q}-1) = {phi_n}")
         
         # Step 4: Choose e such that 1 < e < φ(n) and gcd(e, φ(n)) = 1
         # For digital signatures, we often use smaller e values
@@ -110,20 +142,32 @@ class RSADigitalSignature:
             while e < phi_n and self.gcd(e, phi_n) != 1:
                 e += 2
         
-        print(f"Public exponent e = {e}")
+        if trace:
+            trace.step(f"Public exponent e = {e}")
         
         # Step 5: Calculate d, the modular multiplicative inverse of e
-        d = self.mod_inverse(e, phi_n)
-        print(f"Private exponent d = {d}")
+        with self.stage('generate_keypair', 'private_exponent'):
+            d = self.mod_inverse(e, phi_n)
+        if trace:
+            trace.step(f"Private exponent d = {d}")
         
-        # Store keys for the user
-        self.users[username] = {
-            'public_key': {'n': n, 'e': e},
-            'private_key': {'n': n, 'd': d},
-            'key_details': {
-                'p': p, 'q': q, 'phi_n': phi_n
-            }
-        }
+        # Step 6: Precompute the CRT parameters used for fast signing
+        with self.stage('generate_keypair', 'crt_params'):
+            crt = self.crt_params(p, q, d)
+        if trace:
+            trace.step(f"CRT parameters: dP = {crt['dP']}, dQ = {crt['dQ']}, qInv = {crt['qInv']}")
+        
+        # Store keys for the user, dropping cached state of any key they replace
+        with self.stage('generate_keypair', 'store'):
+            # Swapped in one step, so a racing rotation of the same user
+            # cannot hide the key this one replaces
+            previous = self.users.swap(username, KeyRecord(n, e, d, p, q, **crt))
+            if previous is not None:
+                old_n = previous.n
+                old_e = previous.e
+                self.verifier_cache.invalidate(old_n, old_e)
+                if self.result_cache is not None:
+                    self.result_cache.invalidate(key_fingerprint(old_n, old_e))
         
         return {
             'username': username,
@@ -134,6 +178,70 @@ class RSADigitalSignature:
             }
         }
     
+    def crt_params(self, p, q, d):
+        """Precompute the Chinese Remainder Theorem parameters of a private key"""
+        return {
+            'dP': d % (p - 1),               # d mod (p-1)
+            'dQ': d % (q - 1),               # d mod (q-1)
+            'qInv': self.mod_inverse(q, p)   # q^-1 mod p
+        }
+    
+    def power_mod_crt(self, base, key):
+        """Compute base^d mod n from two half-size exponentiations mod p and q
+
+        key is a KeyRecord holding the CRT parameters.
+        """
+        p = key.p
+        q = key.q
+        
+        m1 = self.power_mod(base, key.dP, p)
+        m2 = self.power_mod(base, key.dQ, q)
+        
+        # Garner's recombination: result = m2 + q * (qInv * (m1 - m2) mod p)
+        h = (key.qInv * (m1 - m2)) % p
+        return m2 + h * q
+    
+    def private_key_op(self, hash_int, key, trace=None):
+        """Apply a KeyRecord's private key using CRT, guarded by a consistency check
+
+        A fault in one of the half-size exponentiations would produce a
+        signature that reveals a factor of n, so every CRT result is checked
+        with the public exponent before it is released. On mismatch the full
+        exponent is used instead, and nothing is released unless it checks out.
+        """
+        n = key.n
+        e = key.e
+        
+        if key.dP is not None:
+            signature = self.power_mod_crt(hash_int, key)
+            if self.power_mod(signature, e, n) == hash_int:
+                return signature, True
+            if trace:
+                trace.step("CRT consistency check failed, falling back to full exponent")
+        
+        signature = self.power_mod(hash_int, key.d, n)
+        if self.power_mod(signature, e, n) != hash_int:
+            raise ValueError("Signature consistency check failed")
+        return signature, False
+    
+    def sign_hash_int(self, username, user, hash_int, trace=None):
+        """Sign a reduced hash with a user's key, in the signing pool when one is configured"""
+        if self.signing_pool is not None:
+            return self.signing_pool.sign(username, user, hash_int)
+        return self.private_key_op(hash_int, user, trace)
+    
+    def recover_hash(self, verifier, signature):
+        """Apply a public key to a signature, in the signing pool when one is configured"""
+        if self.signing_pool is not None:
+            return self.signing_pool.recover(verifier.n, verifier.e, signature)
+        return verifier.recover(signature)
+    
+    def signature_to_int(self, signature):
+        """Read a signature sent as raw big-endian bytes, an integer or decimal text"""
+        if isinstance(signature, (bytes, bytearray)):
+            return int.from_bytes(signature, 'big')
+        return int(signature)
+    
     def hash_message(self, message):
         """Create SHA-256 hash of the message"""
         # Convert message to bytes and hash
@@ -151,39 +259,50 @@ class RSADigitalSignature:
             'hash_length': len(hash_hex)
         }
     
-    def sign_message(self, username, message):
+    def sign_message(self, username, message, trace=None):
         """Sign a message using the user's private key"""
-        if username not in self.users:
+        with self.stage('sign', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
             raise ValueError(f"User {username} not found. Generate keys first.")
         
-        print(f"=== Digital Signature Process for {username} ===")
+        if trace is None:
+            trace = self.new_trace()
+        
+        if trace:
+            trace.begin(f"Digital Signature Process for {username}")
         
         # Step 1: Hash the message
-        hash_info = self.hash_message(message)
+        with self.stage('sign', 'hash'):
+            hash_info = self.hash_message(message)
         hash_int = hash_info['hash_int']
         
-        print(f"Original Message: '{message}'")
-        print(f"SHA-256 Hash: {hash_info['hash_hex']}")
-        print(f"Hash as Integer: {hash_int}")
+        if trace:
+            trace.step(f"Original Message: '{message}'")
+            trace.step(f"SHA-256 Hash: {hash_info['hash_hex']}")
+            trace.step(f"Hash as Integer: {hash_int}")
         
         # Step 2: Get user's private key
-        private_key = self.users[username]['private_key']
-        n = private_key['n']
-        d = private_key['d']
+        n = user.n
+        d = user.d
         
-        print(f"Private Key: n={n}, d={d}")
+        if trace:
+            trace.step(f"Private Key: n={n}, d={d}")
         
         # Step 3: Reduce hash if it's larger than n
         if hash_int >= n:
             # Take modulo to fit within key size
             hash_int = hash_int % n
-            print(f"Hash reduced to fit key size: {hash_int}")
+            if trace:
+                trace.step(f"Hash reduced to fit key size: {hash_int}")
         
         # Step 4: Create digital signature using RSA private key
-        # Signature = hash^d mod n
-        signature = self.power_mod(hash_int, d, n)
+        # Signature = hash^d mod n, computed via CRT when p and q are known
+        with self.stage('sign', 'private_key_op'):
+            signature, used_crt = self.sign_hash_int(username, user, hash_int, trace)
         
-        print(f"Digital Signature: {hash_int}^{d} mod {n} = {signature}")
+        if trace:
+            trace.step(f"Digital Signature: {hash_int}^{d} mod {n} = {signature}")
         
         return {
             'username': username,
@@ -193,56 +312,74 @@ class RSADigitalSignature:
             'signing_details': {
                 'private_key_n': n,
                 'private_key_d': d,
-                'hash_before_signing': hash_int
+                'hash_before_signing': hash_int,
+                'used_crt': used_crt
             }
         }
     
-    def verify_signature(self, username, message, signature):
+    def verify_signature(self, username, message, signature, trace=None):
         """Verify a digital signature using the user's public key"""
-        if username not in self.users:
+        with self.stage('verify', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
             raise ValueError(f"User {username} not found.")
         
-        print(f"=== Signature Verification Process ===")
+        if trace is None:
+            trace = self.new_trace()
+        
+        if trace:
+            trace.begin("Signature Verification Process")
         
         # Step 1: Hash the received message
-        hash_info = self.hash_message(message)
+        with self.stage('verify', 'hash'):
+            hash_info = self.hash_message(message)
         received_hash = hash_info['hash_int']
         
-        print(f"Received Message: '{message}'")
-        print(f"SHA-256 Hash of Received Message: {hash_info['hash_hex']}")
-        print(f"Hash as Integer: {received_hash}")
+        if trace:
+            trace.step(f"Received Message: '{message}'")
+            trace.step(f"SHA-256 Hash of Received Message: {hash_info['hash_hex']}")
+            trace.step(f"Hash as Integer: {received_hash}")
         
         # Step 2: Get user's public key
-        public_key = self.users[username]['public_key']
-        n = public_key['n']
-        e = public_key['e']
+        n = user.n
+        e = user.e
         
-        print(f"Public Key: n={n}, e={e}")
-        print(f"Received Signature: {signature}")
+        if trace:
+            trace.step(f"Public Key: n={n}, e={e}")
+            trace.step(f"Received Signature: {signature}")
         
         # Step 3: Reduce hash if it's larger than n (same as in signing)
         if received_hash >= n:
             received_hash = received_hash % n
-            print(f"Hash reduced to fit key size: {received_hash}")
+            if trace:
+                trace.step(f"Hash reduced to fit key size: {received_hash}")
         
         # Step 4: Decrypt the signature using RSA public key
-        # Decrypted = signature^e mod n
-        decrypted_hash = self.power_mod(signature, e, n)
+        # Decrypted = signature^e mod n (or a cached result for this exact triple)
+        with self.stage('verify', 'verifier_lookup'):
+            verifier = self.verifier_cache.get(n, e)
+        with self.stage('verify', 'public_key_op'):
+            decrypted_hash, cache_hit = self.recover_signed_hash(verifier, hash_info['hash_hex'], signature)
         
-        print(f"Decrypted Signature: {signature}^{e} mod {n} = {decrypted_hash}")
+        if trace:
+            if cache_hit:
+                trace.step("Result served from the verification cache")
+            trace.step(f"Decrypted Signature: {signature}^{e} mod {n} = {decrypted_hash}")
         
         # Step 5: Compare decrypted hash with computed hash
         is_valid = (decrypted_hash == received_hash)
         
-        print(f"Hash from Message: {received_hash}")
-        print(f"Hash from Signature: {decrypted_hash}")
-        print(f"Signature Valid: {is_valid}")
+        if trace:
+            trace.step(f"Hash from Message: {received_hash}")
+            trace.step(f"Hash from Signature: {decrypted_hash}")
+            trace.step(f"Signature Valid: {is_valid}")
         
         return {
             'username': username,
             'message': message,
             'signature': signature,
             'is_valid': is_valid,
+            'cache_hit': cache_hit,
             'verification_details': {
                 'computed_hash': received_hash,
                 'decrypted_hash': decrypted_hash,
@@ -251,30 +388,419 @@ class RSADigitalSignature:
                 'message_hash_info': hash_info
             }
         }
+    
+    def recover_signed_hash(self, verifier, hash_hex, signature):
+        """Apply the public key to a signature, using the result cache when enabled
 
-# Initialize RSA system
-rsa_system = RSADigitalSignature()
+        Returns the recovered hash and whether it came from the cache.
+        """
+        if self.result_cache is None:
+            return self.recover_hash(verifier, signature), False
+        
+        decrypted_hash = self.result_cache.get(verifier.fingerprint, hash_hex, signature)
+        if decrypted_hash is not None:
+            return decrypted_hash, True
+        
+        decrypted_hash = self.recover_hash(verifier, signature)
+        self.result_cache.put(verifier.fingerprint, hash_hex, signature, decrypted_hash)
+        return decrypted_hash, False
+    
+    def hash_stream(self, chunks):
+        """Create SHA-256 hash of a byte stream without holding it in memory"""
+        hash_object = hashlib.sha256()
+        bytes_hashed = 0
+        for chunk in chunks:
+            hash_object.update(chunk)
+            bytes_hashed += len(chunk)
+        
+        hash_hex = hash_object.hexdigest()
+        return {
+            'hash_hex': hash_hex,
+            'hash_int': int(hash_hex, 16),
+            'hash_length': len(hash_hex),
+            'bytes_hashed': bytes_hashed
+        }
+    
+    def sign_stream(self, username, chunks):
+        """Sign a byte stream chunk by chunk; returns only the digest and signature
 
-@app.route('/')
+        The stream is hashed exactly as hash_message hashes the UTF-8 bytes
+        of a message, so the signature also verifies through verify_signature.
+        """
+        user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found. Generate keys first.")
+        
+        hash_info = self.hash_stream(chunks)
+        hash_int = hash_info['hash_int'] % user.n
+        signature, _ = self.sign_hash_int(username, user, hash_int)
+        
+        return {
+            'username': username,
+            'hash_hex': hash_info['hash_hex'],
+            'bytes_hashed': hash_info['bytes_hashed'],
+            'signature': signature
+        }
+    
+    def verify_stream(self, username, chunks, signature):
+        """Verify a signature over a byte stream without buffering the stream"""
+        user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found.")
+        
+        hash_info = self.hash_stream(chunks)
+        verifier = self.verifier_cache.get(user.n, user.e)
+        decrypted_hash, cache_hit = self.recover_signed_hash(verifier, hash_info['hash_hex'], signature)
+        is_valid = decrypted_hash == verifier.reduce_hash(hash_info['hash_int'])
+        
+        return {
+            'username': username,
+            'hash_hex': hash_info['hash_hex'],
+            'bytes_hashed': hash_info['bytes_hashed'],
+            'is_valid': is_valid,
+            'cache_hit': cache_hit
+        }
+    
+    def parse_digest(self, digest, algorithm='sha256'):
+        """Check a client-computed digest; returns (algorithm, hex digest, integer)
+
+        The digest may be hex text or raw bytes. Algorithm names are
+        case-insensitive and may be written with a dash, as in SHA-256.
+        The integer is the value to sign: the digest behind its algorithm's
+        DigestInfo prefix.
+        """
+        name = str(algorithm).lower().replace('-', '')
+        if name not in DIGEST_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported digest algorithm {algorithm!r}; use one of {', '.join(DIGEST_ALGORITHMS)}"
+            )
+        
+        if isinstance(digest, str):
+            try:
+                digest = bytes.fromhex(digest)
+            except ValueError:
+                raise ValueError("Digest must be hex text or raw bytes") from None
+        digest = bytes(digest)
+        if len(digest) != DIGEST_ALGORITHMS[name]:
+            raise ValueError(
+                f"A {name} digest is {DIGEST_ALGORITHMS[name]} bytes, got {len(digest)}"
+            )
+        encoded = DIGEST_INFO_PREFIXES.get(name, b'') + digest
+        return name, digest.hex(), int.from_bytes(encoded, 'big')
+    
+    def sign_digest(self, username, digest, algorithm='sha256'):
+        """Sign a digest the client computed, without ever seeing the document
+
+        Other digests are signed with their algorithm's DigestInfo prefix,
+        so a signature only verifies under the algorithm it was made for. A
+        SHA-256 digest is signed exactly as sign_message signs its hash, so
+        its signature also verifies through verify_signature.
+        """
+        with self.stage('sign_digest', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found. Generate keys first.")
+        
+        algorithm, digest_hex, hash_int = self.parse_digest(digest, algorithm)
+        hash_int %= user.n
+        with self.stage('sign_digest', 'private_key_op'):
+            signature, _ = self.sign_hash_int(username, user, hash_int)
+        
+        return {
+            'username': username,
+            'algorithm': algorithm,
+            'digest': digest_hex,
+            'signature': signature
+        }
+    
+    def verify_digest(self, username, digest, signature, algorithm='sha256'):
+        """Verify a signature against a client-computed digest
+
+        A signature made for another algorithm fails, even for the same
+        digest bytes.
+        """
+        with self.stage('verify_digest', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found.")
+        
+        algorithm, digest_hex, hash_int = self.parse_digest(digest, algorithm)
+        with self.stage('verify_digest', 'verifier_lookup'):
+            verifier = self.verifier_cache.get(user.n, user.e)
+        with self.stage('verify_digest', 'public_key_op'):
+            decrypted_hash, cache_hit = self.recover_signed_hash(verifier, digest_hex, signature)
+        is_valid = decrypted_hash == verifier.reduce_hash(hash_int)
+        
+        return {
+            'username': username,
+            'algorithm': algorithm,
+            'is_valid': is_valid,
+            'cache_hit': cache_hit
+        }
+    
+    def _parse_batch_item(self, item, fields):
+        """Read a batch item given either as an object or as a positional array"""
+        if isinstance(item, dict):
+            values = [item.get(field) for field in fields]
+        elif isinstance(item, (list, tuple)) and len(item) == len(fields):
+            values = list(item)
+        else:
+            raise ValueError(f"Item must be an object or a [{', '.join(fields)}] array")
+        
+        for field, value in zip(fields, values):
+            if value is None or value == '':
+                raise ValueError(f"Item is missing '{field}'")
+        if not isinstance(values[0], str):
+            raise ValueError(f"Item '{fields[0]}' must be a string")
+        return values
+    
+    def _group_batch(self, items, fields):
+        """Parse batch items and group their indices by username
+
+        Returns the groups plus a results list pre-filled with errors for
+        items that could not be parsed.
+        """
+        results = [None] * len(items)
+        groups = {}
+        for index, item in enumerate(items):
+            try:
+                values = self._parse_batch_item(item, fields)
+            except ValueError as e:
+                results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+                continue
+            groups.setdefault(values[0], []).append((index, values[1:]))
+        return groups, results
+    
+    def _batch_hash(self, message):
+        """Hash a message to (hex digest, integer) without teaching detail"""
+        hash_hex = hashlib.sha256(message.encode('utf-8')).hexdigest()
+        return hash_hex, int(hash_hex, 16)
+    
+    def sign_batch(self, items):
+        """Sign many (username, message) items, grouped so each key is looked up once
+
+        A failing item is reported in its own result and does not stop the rest.
+        """
+        groups, results = self._group_batch(items, ('username', 'message'))
+        
+        for username, entries in groups.items():
+            user = self.users.get(username)
+            for index, (message,) in entries:
+                try:
+                    if user is None:
+                        raise ValueError(f"User {username} not found. Generate keys first.")
+                    _, hash_int = self._batch_hash(message)
+                    signature, _ = self.private_key_op(hash_int % user.n, user)
+                    results[index] = {'index': index, 'status': 'ok', 'signature': signature}
+                except Exception as e:
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+        
+        return results
+    
+    def verify_batch(self, items, screen=False):
+        """Verify many (username, message, signature) items grouped by key
+
+        With screen=True each key's items are checked together by
+        screen_signatures instead of one exponentiation per item. Items the
+        screen rejects get is_valid False; items that pass get screened True
+        and no is_valid, since a screen does not prove each signature valid.
+        A failing item is reported in its own result and does not stop the rest.
+        """
+        groups, results = self._group_batch(items, ('username', 'message', 'signature'))
+        
+        for username, entries in groups.items():
+            user = self.users.get(username)
+            if user is not None:
+                verifier = self.verifier_cache.get(user.n, user.e)
+            if screen and user is not None:
+                self._screen_group(verifier, entries, results)
+                continue
+            for index, (message, signature) in entries:
+                try:
+                    if user is None:
+                        raise ValueError(f"User {username} not found.")
+                    hash_hex, hash_int = self._batch_hash(message)
+                    decrypted_hash, cache_hit = self.recover_signed_hash(verifier, hash_hex, self.signature_to_int(signature))
+                    is_valid = decrypted_hash == verifier.reduce_hash(hash_int)
+                    results[index] = {'index': index, 'status': 'ok', 'is_valid': is_valid,
+                                      'cache_hit': cache_hit}
+                except Exception as e:
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+        
+        return results
+    
+    def _screen_group(self, verifier, entries, results):
+        """Screen one key's batch items and fill in their results"""
+        indices, hashes, signatures = [], [], []
+        for index, (message, signature) in entries:
+            try:
+                _, hash_int = self._batch_hash(message)
+                signature = self.signature_to_int(signature)
+            except Exception as e:
+                results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+                continue
+            indices.append(index)
+            hashes.append(verifier.reduce_hash(hash_int))
+            signatures.append(signature)
+        
+        # Flagged pairs are known to fail on their own; the rest only passed a
+        # screen, which is not proof of validity, so they carry no is_valid
+        invalid = set(verifier.find_invalid(hashes, signatures))
+        for position, index in enumerate(indices):
+            if position in invalid:
+                results[index] = {'index': index, 'status': 'ok', 'is_valid': False}
+            else:
+                results[index] = {'index': index, 'status': 'ok', 'screened': True}
+    
+    def screen_signatures(self, username, messages, signatures):
+        """Check many signatures under one user's key with a single exponentiation
+
+        All pairs are multiplied together and checked at once; only when
+        that fails is the batch bisected to find the bad pairs. Returns the
+        indices of the invalid pairs. A clean screen shows every message
+        was signed with the key, but not that each signature is exactly the
+        one produced (alterations that cancel out in the product pass), so
+        use verify_signature when the signature values themselves matter.
+        """
+        user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found.")
+        if len(messages) != len(signatures):
+            raise ValueError("messages and signatures must have the same length")
+        
+        verifier = self.verifier_cache.get(user.n, user.e)
+        hashes = [verifier.reduce_hash(self._batch_hash(message)[1]) for message in messages]
+        return verifier.find_invalid(hashes, [self.signature_to_int(s) for s in signatures])
+    
+    def sign_aggregate(self, username, messages):
+        """Sign many messages with one private-key operation
+        
+        The messages are hashed into a Merkle tree and only its root is
+        signed. Each message gets an inclusion proof (hex, one 32-byte
+        sibling hash per tree level) that verify_aggregate checks together
+        with its index, the leaf count and the shared signature.
+        """
+        with self.stage('sign_aggregate', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found. Generate keys first.")
+        if not messages:
+            raise ValueError("At least one message is required")
+        
+        with self.stage('sign_aggregate', 'hash'):
+            tree = MerkleTree.from_messages(message.encode('utf-8') for message in messages)
+            digest = root_digest(tree.root, tree.size)
+        
+        hash_int = int.from_bytes(digest, 'big') % user.n
+        with self.stage('sign_aggregate', 'private_key_op'):
+            signature, _ = self.sign_hash_int(username, user, hash_int)
+        
+        return {
+            'username': username,
+            'root': tree.root.hex(),
+            'leaf_count': tree.size,
+            'signature': signature,
+            'proofs': [{'index': index, 'proof': tree.proof(index).hex()}
+                       for index in range(tree.size)]
+        }
+    
+    def verify_aggregate(self, username, message, signature, index, leaf_count, proof):
+        """Verify one message of an aggregate-signed batch
+        
+        Costs log2(leaf_count) hashes plus one public-key operation, which
+        the result cache shares between all messages of the same batch.
+        A proof that does not fit the index and leaf count is invalid.
+        """
+        with self.stage('verify_aggregate', 'user_lookup'):
+            user = self.users.get(username)
+        if user is None:
+            raise ValueError(f"User {username} not found.")
+        
+        if isinstance(proof, str):
+            proof = bytes.fromhex(proof)
+        
+        with self.stage('verify_aggregate', 'hash'):
+            try:
+                root = root_from_proof(leaf_hash(message.encode('utf-8')), index, leaf_count, proof)
+            except ValueError:
+                root = None
+        if root is None:
+            return {'username': username, 'is_valid': False, 'cache_hit': False}
+        
+        digest = root_digest(root, leaf_count)
+        with self.stage('verify_aggregate', 'verifier_lookup'):
+            verifier = self.verifier_cache.get(user.n, user.e)
+        with self.stage('verify_aggregate', 'public_key_op'):
+            decrypted_hash, cache_hit = self.recover_signed_hash(verifier, digest.hex(), signature)
+        is_valid = decrypted_hash == verifier.reduce_hash(int.from_bytes(digest, 'big'))
+        
+        return {
+            'username': username,
+            'root': root.hex(),
+            'is_valid': is_valid,
+            'cache_hit': cache_hit
+        }
+
+# Maximum number of items accepted by one batch request
+MAX_BATCH_SIZE = 10000
+
+# Maximum number of messages signed under one aggregate signature per request
+MAX_AGGREGATE_SIZE = 100000
+
+# Default and maximum page sizes for /api/get-users
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Bytes read from the request body at a time by the streaming endpoints
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Routes live on a blueprint; create_app attaches them to an application
+api = Blueprint('api', __name__)
+
+# The RSA system of the application handling the current request
+rsa_system = LocalProxy(lambda: current_app.extensions['rsa_system'])
+
+@api.before_app_request
+def start_request_timer():
+    if rsa_system.metrics is not None:
+        g.request_start = time.perf_counter()
+
+@api.after_app_request
+def record_request_duration(response):
+    """Observe request latency, labelled by route pattern so usernames do not add series"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        rsa_system.metrics.request_seconds.observe(
+            time.perf_counter() - start, request.method, route, str(response.status_code)
+        )
+    return response
+
+@api.route('/')
 def index():
     """Serve the main HTML page"""
     return render_template('index.html')
 
-@app.route('/api/generate-keys', methods=['POST'])
+@api.route('/api/generate-keys', methods=['POST'])
 def generate_keys():
     """Generate RSA key pair for a user"""
     try:
-        data = request.get_json()
+        with rsa_system.stage('generate_keypair', 'parse_request'):
+            data = request.get_json()
         username = data.get('username', 'DefaultUser')
         bits = data.get('bits', 10)  # Small for demo, use 1024+ in production
         
-        key_info = rsa_system.generate_keypair(username, bits)
+        trace = rsa_system.new_trace()
+        key_info = rsa_system.generate_keypair(username, bits, trace)
+        if trace:
+            key_info['trace'] = trace.steps
         
-        return jsonify({
-            'success': True,
-            'data': key_info,
-            'message': f'RSA key pair generated successfully for {username}'
-        })
+        with rsa_system.stage('generate_keypair', 'serialize_response'):
+            return jsonify({
+                'success': True,
+                'data': key_info,
+                'message': f'RSA key pair generated successfully for {username}'
+            })
     
     except Exception as e:
         return jsonify({
@@ -282,55 +808,447 @@ def generate_keys():
             'error': str(e)
         }), 400
 
-@app.route('/api/sign-message', methods=['POST'])
+def request_payload():
+    """Read the request body as JSON or, when sent as such, the binary wire format"""
+    if request.mimetype == BINARY_MEDIA_TYPE:
+        return decode_message(request.get_data())
+    return request.get_json()
+
+def wants_binary():
+    """Whether the client's Accept header prefers the binary wire format"""
+    best = request.accept_mimetypes.best_match(['application/json', BINARY_MEDIA_TYPE])
+    return best == BINARY_MEDIA_TYPE
+
+def api_response(body, status=200):
+    """Send a response body as JSON or in the binary wire format, as negotiated"""
+    if wants_binary():
+        return Response(encode_message(body), status=status, mimetype=BINARY_MEDIA_TYPE)
+    return jsonify(body), status
+
+def wants_verbose(data):
+    """Whether a sign/verify response should carry the step-by-step teaching fields
+
+    Clients ask with a verbose field or query parameter. Without one, the
+    fields go only to JSON clients in demo mode, as the web interface expects.
+    """
+    verbose = request.args.get('verbose')
+    if verbose is None and isinstance(data, dict):
+        verbose = data.get('verbose')
+    if verbose is None:
+        return rsa_system.execution_mode == DEMO_MODE and not wants_binary()
+    if isinstance(verbose, str):
+        return verbose.lower() in ('1', 'true', 'yes')
+    return bool(verbose)
+
+@api.route('/api/sign-message', methods=['POST'])
 def sign_message():
     """Sign a message with user's private key"""
     try:
-        data = request.get_json()
+        with rsa_system.stage('sign', 'parse_request'):
+            data = request_payload()
         username = data.get('username')
         message = data.get('message')
         
         if not username or not message:
-            return jsonify({
+            return api_response({
                 'success': False,
                 'error': 'Username and message are required'
-            }), 400
+            }, 400)
         
-        signature_info = rsa_system.sign_message(username, message)
+        trace = rsa_system.new_trace()
+        signature_info = rsa_system.sign_message(username, message, trace)
+        if not wants_verbose(data):
+            signature_info = {
+                'username': username,
+                'hash_hex': signature_info['message_hash']['hash_hex'],
+                'signature': signature_info['signature']
+            }
+        elif trace:
+            signature_info['trace'] = trace.steps
         
-        return jsonify({
-            'success': True,
-            'data': signature_info,
-            'message': 'Message signed successfully'
-        })
+        with rsa_system.stage('sign', 'serialize_response'):
+            return api_response({
+                'success': True,
+                'data': signature_info,
+                'message': 'Message signed successfully'
+            })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
     
     except Exception as e:
-        return jsonify({
+        return api_response({
             'success': False,
             'error': str(e)
-        }), 400
+        }, 400)
 
-@app.route('/api/verify-signature', methods=['POST'])
+@api.route('/api/verify-signature', methods=['POST'])
 def verify_signature():
     """Verify a digital signature"""
     try:
-        data = request.get_json()
+        with rsa_system.stage('verify', 'parse_request'):
+            data = request_payload()
         username = data.get('username')
         message = data.get('message')
         signature = data.get('signature')
         
         if not username or not message or signature is None:
-            return jsonify({
+            return api_response({
                 'success': False,
                 'error': 'Username, message, and signature are required'
-            }), 400
+            }, 400)
         
-        verification_info = rsa_system.verify_signature(username, message, int(signature))
+        trace = rsa_system.new_trace()
+        verification_info = rsa_system.verify_signature(
+            username, message, rsa_system.signature_to_int(signature), trace
+        )
+        if not wants_verbose(data):
+            verification_info = {
+                'username': username,
+                'is_valid': verification_info['is_valid'],
+                'cache_hit': verification_info['cache_hit']
+            }
+        elif trace:
+            verification_info['trace'] = trace.steps
         
-        return jsonify({
+        with rsa_system.stage('verify', 'serialize_response'):
+            return api_response({
+                'success': True,
+                'data': verification_info,
+                'message': 'Signature verification completed'
+            })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+def run_batch(operation, flags=()):
+    """Validate a batch request body and run it through the given batch method
+
+    Boolean body fields named in `flags` are passed on as keyword arguments;
+    they must be JSON true or false.
+    """
+    data = request_payload()
+    items = data.get('items') if isinstance(data, dict) else None
+    
+    if not isinstance(items, list):
+        return api_response({
+            'success': False,
+            'error': 'items must be an array'
+        }, 400)
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return api_response({
+            'success': False,
+            'error': f'A batch can contain at most {MAX_BATCH_SIZE} items'
+        }, 400)
+    
+    options = {flag: data[flag] for flag in flags if flag in data}
+    for flag, value in options.items():
+        if not isinstance(value, bool):
+            return api_response({
+                'success': False,
+                'error': f'{flag} must be true or false'
+            }, 400)
+    
+    results = operation(items, **options)
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    
+    return api_response({
+        'success': True,
+        'data': {
+            'results': results,
+            'succeeded': len(results) - failed,
+            'failed': failed
+        }
+    })
+
+@api.route('/api/sign-batch', methods=['POST'])
+def sign_batch():
+    """Sign an array of messages in one request"""
+    try:
+        return run_batch(rsa_system.sign_batch)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/verify-batch', methods=['POST'])
+def verify_batch():
+    """Verify an array of signatures in one request
+
+    With "screen": true, each signer's items are checked together with one
+    exponentiation, and bisected only if that check fails. Items that pass
+    are reported as "screened" rather than "is_valid".
+    """
+    try:
+        return run_batch(rsa_system.verify_batch, flags=('screen',))
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/sign-aggregate', methods=['POST'])
+def sign_aggregate():
+    """Sign an array of messages under one Merkle-root signature"""
+    try:
+        data = request_payload()
+        username = data.get('username')
+        messages = data.get('messages')
+
+        if not username or not isinstance(messages, list) or not messages:
+            return api_response({
+                'success': False,
+                'error': 'Username and a non-empty messages array are required'
+            }, 400)
+
+        if len(messages) > MAX_AGGREGATE_SIZE:
+            return api_response({
+                'success': False,
+                'error': f'An aggregate can contain at most {MAX_AGGREGATE_SIZE} messages'
+            }, 400)
+
+        signature_info = rsa_system.sign_aggregate(username, messages)
+
+        return api_response({
+            'success': True,
+            'data': signature_info,
+            'message': f'{len(messages)} messages signed under one signature'
+        })
+
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/verify-aggregate', methods=['POST'])
+def verify_aggregate():
+    """Verify one message against an aggregate signature and its inclusion proof"""
+    try:
+        data = request_payload()
+        username = data.get('username')
+        message = data.get('message')
+        signature = data.get('signature')
+        index = data.get('index')
+        leaf_count = data.get('leaf_count')
+        proof = data.get('proof')
+
+        if (not username or not message or signature is None or index is None
+                or leaf_count is None or proof is None):
+            return api_response({
+                'success': False,
+                'error': 'Username, message, signature, index, leaf_count and proof are required'
+            }, 400)
+
+        verification_info = rsa_system.verify_aggregate(
+            username, message, rsa_system.signature_to_int(signature),
+            int(index), int(leaf_count), proof
+        )
+
+        return api_response({
             'success': True,
             'data': verification_info,
-            'message': 'Signature verification completed'
+            'message': 'Aggregate signature verification completed'
+        })
+
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/sign-digest', methods=['POST'])
+def sign_digest():
+    """Sign a client-computed digest instead of an uploaded message"""
+    try:
+        data = request_payload()
+        username = data.get('username')
+        digest = data.get('digest')
+        
+        if not username or not digest:
+            return api_response({
+                'success': False,
+                'error': 'Username and digest are required'
+            }, 400)
+        
+        signature_info = rsa_system.sign_digest(username, digest, data.get('algorithm', 'sha256'))
+        
+        return api_response({
+            'success': True,
+            'data': signature_info,
+            'message': 'Digest signed successfully'
+        })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/verify-digest', methods=['POST'])
+def verify_digest():
+    """Verify a signature against a client-computed digest"""
+    try:
+        data = request_payload()
+        username = data.get('username')
+        digest = data.get('digest')
+        signature = data.get('signature')
+        
+        if not username or not digest or signature is None:
+            return api_response({
+                'success': False,
+                'error': 'Username, digest, and signature are required'
+            }, 400)
+        
+        verification_info = rsa_system.verify_digest(
+            username, digest, rsa_system.signature_to_int(signature), data.get('algorithm', 'sha256')
+        )
+        
+        return api_response({
+            'success': True,
+            'data': verification_info,
+            'message': 'Digest verification completed'
+        })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+def iter_request_body(chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the raw request body in chunks without buffering all of it"""
+    stream = request.stream
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+@api.route('/api/sign-stream/<username>', methods=['POST'])
+def sign_stream(username):
+    """Sign the raw request body as a stream"""
+    try:
+        signature_info = rsa_system.sign_stream(username, iter_request_body())
+        
+        return api_response({
+            'success': True,
+            'data': signature_info,
+            'message': 'Stream signed successfully'
+        })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/api/verify-stream/<username>', methods=['POST'])
+def verify_stream(username):
+    """Verify a signature over the raw request body as a stream
+
+    The signature is passed in the X-Signature header or the signature
+    query parameter, since the body is the signed payload itself.
+    """
+    try:
+        signature = request.headers.get('X-Signature') or request.args.get('signature')
+        if signature is None:
+            return api_response({
+                'success': False,
+                'error': 'Signature is required (X-Signature header or signature parameter)'
+            }, 400)
+        
+        verification_info = rsa_system.verify_stream(username, iter_request_body(), int(signature))
+        
+        return api_response({
+            'success': True,
+            'data': verification_info,
+            'message': 'Stream verification completed'
+        })
+    
+    except SigningPoolBusy as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 503)
+    
+    except Exception as e:
+        return api_response({
+            'success': False,
+            'error': str(e)
+        }, 400)
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose stage and request latency histograms in Prometheus text format"""
+    metrics = rsa_system.metrics
+    if metrics is None:
+        return jsonify({
+            'success': False,
+            'error': 'Metrics are disabled (RSA_METRICS=0)'
+        }), 404
+    
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/key-pool/stats', methods=['GET'])
+def key_pool_stats():
+    """Get depth, refill rate and hit/miss counts of the key pool"""
+    try:
+        if rsa_system.key_pool is None:
+            return jsonify({
+                'success': False,
+                'error': 'Key pool is disabled'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': rsa_system.key_pool.stats()
         })
     
     except Exception as e:
@@ -339,20 +1257,65 @@ def verify_signature():
             'error': str(e)
         }), 400
 
-@app.route('/api/get-users', methods=['GET'])
-def get_users():
-    """Get list of users with their public keys"""
+def encode_cursor(username):
+    """Turn the last username of a page into an opaque cursor"""
+    return base64.urlsafe_b64encode(username.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Recover the username a cursor points after"""
     try:
-        users_info = {}
-        for username, user_data in rsa_system.users.items():
-            users_info[username] = {
-                'username': username,
-                'public_key': user_data['public_key']
-            }
+        return base64.b64decode(cursor.encode('ascii'), altchars=b'-_', validate=True).decode('utf-8')
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor') from None
+
+def stream_users_page(prefix, after, limit):
+    """Yield one page of the user listing as JSON text, one user at a time"""
+    yield '{"success": true, "data": {'
+    
+    # Fetch one extra entry to find out whether another page follows
+    last_username = None
+    count = 0
+    for username, public_key in rsa_system.users.iter_public_keys(prefix, after, limit + 1):
+        if count == limit:
+            break
+        entry = {'username': username, 'public_key': public_key}
+        yield f'{"," if count else ""}{json.dumps(username)}: {json.dumps(entry)}'
+        last_username = username
+        count += 1
+    else:
+        last_username = None
+    
+    next_cursor = encode_cursor(last_username) if last_username is not None else None
+    yield f'}}, "count": {count}, "next_cursor": {json.dumps(next_cursor)}}}'
+
+@api.route('/api/verifier-cache/stats', methods=['GET'])
+def verifier_cache_stats():
+    """Get size and hit/miss counts of the public key verifier cache"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': rsa_system.verifier_cache.stats()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@api.route('/api/verify-result-cache/stats', methods=['GET'])
+def verify_result_cache_stats():
+    """Get size and hit/miss counts of the verification result cache"""
+    try:
+        if rsa_system.result_cache is None:
+            return jsonify({
+                'success': False,
+                'error': 'Verification result cache is disabled'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': users_info
+            'data': rsa_system.result_cache.stats()
         })
     
     except Exception as e:
@@ -361,24 +1324,86 @@ def get_users():
             'error': str(e)
         }), 400
 
-@app.route('/api/get-user/<username>', methods=['GET'])
+@api.route('/api/signing-pool/stats', methods=['GET'])
+def signing_pool_stats():
+    """Get worker count, queue depth and task counts of the signing pool"""
+    try:
+        if rsa_system.signing_pool is None:
+            return jsonify({
+                'success': False,
+                'error': 'Signing pool is disabled'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': rsa_system.signing_pool.stats()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@api.route('/api/get-users', methods=['GET'])
+def get_users():
+    """Get a page of users with their public keys
+
+    Query parameters: prefix (username prefix filter), limit (page size)
+    and cursor (the next_cursor of the previous page). The response is
+    streamed and carries an ETag, so polling clients get a 304 when no
+    key has changed.
+    """
+    try:
+        prefix = request.args.get('prefix', '')
+        cursor = request.args.get('cursor')
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'
+            }), 400
+        
+        after = decode_cursor(cursor) if cursor else None
+        
+        # The listing only changes when the store version does
+        etag_source = json.dumps([rsa_system.users.version, prefix, after, limit])
+        etag = hashlib.sha256(etag_source.encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = Response(stream_with_context(stream_users_page(prefix, after, limit)),
+                            mimetype='application/json')
+        response.set_etag(etag)
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@api.route('/api/get-user/<username>', methods=['GET'])
 def get_user(username):
     """Get specific user's key information"""
     try:
-        if username not in rsa_system.users:
+        user_data = rsa_system.users.get(username)
+        if user_data is None:
             return jsonify({
                 'success': False,
                 'error': f'User {username} not found'
             }), 404
         
-        user_data = rsa_system.users[username]
         return jsonify({
             'success': True,
             'data': {
                 'username': username,
-                'public_key': user_data['public_key'],
+                'public_key': user_data.public_key(),
                 'has_private_key': True,  # Don't expose private key
-                'key_details': user_data['key_details']
+                'key_details': user_data.key_details()
             }
         })
     
@@ -388,9 +1413,74 @@ def get_user(username):
             'error': str(e)
         }), 400
 
+@api.route('/api/health', methods=['GET'])
+def health():
+    """Cheap liveness check that touches no key material"""
+    return jsonify({
+        'success': True,
+        'status': 'ok'
+    })
+
+def build_rsa_system():
+    """Create the RSA system configured by environment variables
+
+    Nothing expensive happens here: worker processes start on first use
+    and stored keys are loaded on demand.
+    """
+    return RSADigitalSignature(
+        key_pool=KeyPool.from_env(),
+        execution_mode=execution_mode_from_env(),
+        key_store=key_store_from_env(),
+        result_cache=VerificationResultCache.from_env(),
+        signing_pool=SigningPool.from_env(RSADigitalSignature),
+        metrics=Metrics.from_env()
+    )
+
+def warm_up(system, key_pool=True, verifiers=True):
+    """Prepare for traffic: start filling the key pool and parse stored public keys
+
+    Loads as many public keys as the verifier cache holds, so their
+    verifiers and fingerprints are built before the first request.
+    """
+    if key_pool and system.key_pool is not None:
+        system.key_pool.warm()
+    
+    if verifiers:
+        limit = system.verifier_cache.capacity
+        for _, public_key in system.users.iter_public_keys(limit=limit):
+            system.verifier_cache.get(public_key['n'], public_key['e'])
+
+def create_app(system=None, warm=None):
+    """Application factory
+
+    Uses the given RSA system, or builds one from the environment. When
+    `warm` is true (default: RSA_WARM_UP=1), warm_up runs in a background
+    thread so it never delays the first request.
+    """
+    if system is None:
+        system = build_rsa_system()
+    if warm is None:
+        warm = os.environ.get('RSA_WARM_UP') == '1'
+    
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    flask_app.extensions['rsa_system'] = system
+    flask_app.register_blueprint(api)
+    
+    if warm:
+        threading.Thread(target=warm_up, args=(system,), name='rsa-warm-up', daemon=True).start()
+    
+    return flask_app
+
+def __getattr__(name):
+    """Build the default application the first time `app.app` is used"""
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 if __name__ == '__main__':
     # Create templates directory and basic HTML if it doesn't exist
-    import os
     if not os.path.exists('templates'):
         os.makedirs('templates')
     
@@ -400,8 +1490,21 @@ if __name__ == '__main__':
     print("   POST /api/generate-keys    - Generate RSA key pair")
     print("   POST /api/sign-message     - Sign a message")
     print("   POST /api/verify-signature - Verify a signature")
+    print("   POST /api/sign-batch       - Sign many messages")
+    print("   POST /api/verify-batch     - Verify many signatures")
+    print("   POST /api/sign-stream/<name>   - Sign a streamed payload")
+    print("   POST /api/verify-stream/<name> - Verify a streamed payload")
     print("   GET  /api/get-users        - List all users")
     print("   GET  /api/get-user/<name>  - Get user details")
+    print("   GET  /api/key-pool/stats   - Key pool statistics")
+    print("   GET  /api/verifier-cache/stats - Verifier cache statistics")
+    print("   GET  /api/verify-result-cache/stats - Verification result cache statistics")
+    print("   GET  /api/signing-pool/stats - Signing pool statistics")
+    print("   GET  /api/health           - Liveness check")
+    print("   GET  /metrics              - Prometheus metrics")
     print("\n🚀 Server running on http://localhost:5000")
     
+    # Start pre-generating key material before the first request arrives.
+    # Only the reloader's child process serves requests, so skip the parent
+    app = create_app(warm=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,145 @@
+import math
+import os
+
+try:
+    import gmpy2
+except ImportError:  # gmpy2 is optional
+    gmpy2 = None
+
+
+class TeachingBackend:
+    """Pure-Python modular arithmetic that shows every step of the algorithms"""
+
+    name = 'teaching'
+
+    def gcd(self, a, b):
+        """Calculate Greatest Common Divisor using Euclidean algorithm"""
+        while b:
+            a, b = b, a % b
+        return a
+
+    def extended_gcd(self, a, b):
+        """Extended Euclidean Algorithm to find modular inverse"""
+        if a == 0:
+            return b, 0, 1
+
+        gcd, x1, y1 = self.extended_gcd(b % a, a)
+        x = y1 - (b // a) * x1
+        y = x1
+
+        return gcd, x, y
+
+    def mod_inverse(self, e, phi_n):
+        """Calculate modular multiplicative inverse"""
+        gcd, x, y = self.extended_gcd(e, phi_n)
+        if gcd != 1:
+            raise ValueError("Modular inverse does not exist")
+        return (x % phi_n + phi_n) % phi_n
+
+    def power_mod(self, base, exp, mod):
+        """Fast modular exponentiation using binary method"""
+        result = 1
+        base = base % mod
+
+        while exp > 0:
+            # If exp is odd, multiply base with result
+            if exp % 2 == 1:
+                result = (result * base) % mod
+
+            # exp must be even now
+            exp = exp >> 1  # exp = exp / 2
+            base = (base * base) % mod
+
+        return result
+
+
+class NativeBackend:
+    """Modular arithmetic using the interpreter's built-in big-integer routines"""
+
+    name = 'native'
+
+    def gcd(self, a, b):
+        """Calculate Greatest Common Divisor"""
+        return math.gcd(a, b)
+
+    def extended_gcd(self, a, b):
+        """Iterative Extended Euclidean Algorithm, returns (gcd, x, y) with ax + by = gcd"""
+        old_r, r = a, b
+        old_x, x = 1, 0
+        old_y, y = 0, 1
+
+        while r:
+            quotient = old_r // r
+            old_r, r = r, old_r - quotient * r
+            old_x, x = x, old_x - quotient * x
+            old_y, y = y, old_y - quotient * y
+
+        return old_r, old_x, old_y
+
+    def mod_inverse(self, e, phi_n):
+        """Calculate modular multiplicative inverse"""
+        try:
+            return pow(e, -1, phi_n)
+        except ValueError:
+            raise ValueError("Modular inverse does not exist") from None
+
+    def power_mod(self, base, exp, mod):
+        """Modular exponentiation with the built-in three-argument pow"""
+        return pow(base, exp, mod)
+
+
+class Gmpy2Backend:
+    """Modular arithmetic using GMP through gmpy2; results are plain ints"""
+
+    name = 'gmpy2'
+
+    def __init__(self):
+        if gmpy2 is None:
+            raise ValueError("The gmpy2 backend requires the gmpy2 package")
+
+    def gcd(self, a, b):
+        """Calculate Greatest Common Divisor"""
+        return int(gmpy2.gcd(a, b))
+
+    def extended_gcd(self, a, b):
+        """Extended Euclidean Algorithm, returns (gcd, x, y) with ax + by = gcd"""
+        gcd, x, y = gmpy2.gcdext(a, b)
+        return int(gcd), int(x), int(y)
+
+    def mod_inverse(self, e, phi_n):
+        """Calculate modular multiplicative inverse"""
+        try:
+            return int(gmpy2.invert(e, phi_n))
+        except ZeroDivisionError:
+            raise ValueError("Modular inverse does not exist") from None
+
+    def power_mod(self, base, exp, mod):
+        """Modular exponentiation with GMP"""
+        return int(gmpy2.powmod(base, exp, mod))
+
+
+BACKENDS = {
+    TeachingBackend.name: TeachingBackend,
+    NativeBackend.name: NativeBackend,
+    Gmpy2Backend.name: Gmpy2Backend,
+}
+
+
+def available_backends():
+    """Names of the backends that can be used in this interpreter"""
+    return [name for name in BACKENDS if name != Gmpy2Backend.name or gmpy2 is not None]
+
+
+def get_backend(name=None):
+    """Return an arithmetic backend instance by name
+
+    With no name, RSA_ARITHMETIC_BACKEND is used, falling back to 'auto',
+    which picks gmpy2 when it is installed and the native backend otherwise.
+    """
+    if name is None:
+        name = os.environ.get('RSA_ARITHMETIC_BACKEND', 'auto')
+    if name == 'auto':
+        name = Gmpy2Backend.name if gmpy2 is not None else NativeBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown arithmetic backend: {name}")
+    return BACKENDS[name]()
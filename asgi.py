@@ -0,0 +1,159 @@
+"""ASGI entry point for the RSA Digital Signature API
+
+Serves the same routes as the Flask app through any ASGI server, for example
+
+    hypercorn asgi:application --bind 0.0.0.0:5000            # HTTP/1.1 + h2c
+    hypercorn asgi:application --certfile cert.pem --keyfile key.pem  # HTTP/2 over TLS
+    uvicorn asgi:application --port 5000
+
+Each request runs in a thread pool executor, so the event loop only moves
+bytes and stays free while key generation, signing or verification runs.
+Keep-alive and HTTP/2 are provided by the server. Set RSA_SIGNING_WORKERS
+as well for the RSA work itself to use every core.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+
+# Threads available to run requests; key generation can hold one for seconds
+DEFAULT_THREADS = 32
+
+
+class ASGIRequestBody(io.RawIOBase):
+    """Blocking file-like view of the ASGI request body for a WSGI thread
+
+    Chunks are pulled from the event loop only as the application reads
+    them, so streaming endpoints never buffer the whole payload.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b''
+        self._more_body = True
+
+    def readable(self):
+        return True
+
+    def _fill(self):
+        """Wait for the next body chunk from the client"""
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message['type'] == 'http.request':
+            self._buffer += message.get('body', b'')
+            self._more_body = message.get('more_body', False)
+        else:  # http.disconnect
+            self._more_body = False
+
+    def readinto(self, buffer):
+        while not self._buffer and self._more_body:
+            self._fill()
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class WSGIToASGI:
+    """Run a WSGI application under ASGI with each request in an executor thread"""
+
+    def __init__(self, wsgi_app, max_workers=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.environ.get('RSA_ASGI_THREADS', DEFAULT_THREADS)),
+            thread_name_prefix='asgi-request',
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._handle, scope, receive, send, loop)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _environ(self, scope, body):
+        """Build a WSGI environ from an ASGI HTTP scope"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.input_terminated': True,  # Read chunked bodies until EOF
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[name] = value
+            else:
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _handle(self, scope, receive, send, loop):
+        """Run one request through the WSGI app (executor thread)"""
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+            return lambda data: None  # The legacy write() callable is not supported
+
+        environ = self._environ(scope, ASGIRequestBody(receive, loop))
+        result = self.wsgi_app(environ, start_response)
+        started = False
+        try:
+            for chunk in result:
+                if not started:
+                    send_message({'type': 'http.response.start',
+                                  'status': response['status'],
+                                  'headers': response['headers']})
+                    started = True
+                if chunk:
+                    send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        if not started:
+            send_message({'type': 'http.response.start',
+                          'status': response['status'],
+                          'headers': response['headers']})
+        send_message({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+application = WSGIToASGI(create_app())
@@ -0,0 +1,2 @@
+"""Benchmarks for the RSA primitives. Run from the repository root with
+`python -m benchmarks.<name>`."""
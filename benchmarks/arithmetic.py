@@ -0,0 +1,64 @@
+"""Microbenchmark the modular arithmetic backends across key sizes
+
+    python -m benchmarks.arithmetic --bits 512 1024 2048 4096
+"""
+import argparse
+import random
+import timeit
+
+from arithmetic import available_backends, get_backend
+from primality import find_prime
+
+
+def make_operands(bits):
+    """Build a modulus with a private exponent and a random base of the given size"""
+    p = find_prime(bits // 2)
+    q = find_prime(bits // 2)
+    e = 65537
+    d = pow(e, -1, (p - 1) * (q - 1))
+    return {'n': p * q, 'p': p, 'q': q, 'e': e, 'd': d, 'base': random.randrange(2, p * q)}
+
+
+def run(bits_list, repeat):
+    """Time each backend's power_mod and mod_inverse; return one row per (backend, bits)"""
+    results = []
+    for bits in bits_list:
+        ops = make_operands(bits)
+        for name in available_backends():
+            backend = get_backend(name)
+            timings = {
+                'power_mod_public': lambda: backend.power_mod(ops['base'], ops['e'], ops['n']),
+                'power_mod_private': lambda: backend.power_mod(ops['base'], ops['d'], ops['n']),
+                # Inverting one half-size prime modulo the other, as for qInv
+                'mod_inverse': lambda: backend.mod_inverse(ops['q'], ops['p']),
+                'extended_gcd': lambda: backend.extended_gcd(ops['q'], ops['p']),
+            }
+            for operation, func in timings.items():
+                try:
+                    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+                except RecursionError:
+                    # The recursive teaching extended_gcd cannot handle huge moduli
+                    seconds = None
+                results.append({
+                    'backend': name,
+                    'bits': bits,
+                    'operation': operation,
+                    'seconds': seconds,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, nargs='+', default=[512, 1024, 2048, 4096])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'bits':>6} {'operation':<18} {'best ms':>10}")
+    for row in run(args.bits, args.repeat):
+        best = 'n/a' if row['seconds'] is None else f"{row['seconds'] * 1000:.3f}"
+        print(f"{row['backend']:<10} {row['bits']:>6} {row['operation']:<18} {best:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare screening batch verification with one-by-one verification
+
+    python -m benchmarks.batch_verify --bits 2048 --sizes 10 100 1000 10000 100000 \\
+        --bad 0 1
+
+For each batch size, times checking every pair with its own public-key
+operation against PublicKeyVerifier.find_invalid, which screens the whole
+batch with one exponentiation and bisects only when that fails. --bad
+plants that many invalid signatures at random positions, so the cost of
+bisection shows too. Pairs are made by applying the public key to random
+signatures, since signing 100k messages for real would dominate the run.
+"""
+import argparse
+import random
+import time
+
+from app import RSADigitalSignature
+from tracing import PRODUCTION_MODE
+
+
+def make_pairs(verifier, count, bad):
+    """Return (hashes, signatures, bad indices) with `bad` corrupted signatures"""
+    signatures = [random.randrange(2, verifier.n) for _ in range(count)]
+    hashes = [verifier.recover(signature) for signature in signatures]
+    bad_indices = sorted(random.sample(range(count), min(bad, count)))
+    for index in bad_indices:
+        signatures[index] = signatures[index] * 2 % verifier.n
+    return hashes, signatures, bad_indices
+
+
+def one_by_one(verifier, hashes, signatures):
+    return [index for index, (hash_int, signature) in enumerate(zip(hashes, signatures))
+            if verifier.recover(signature) != hash_int]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, default=2048, help='modulus size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--bad', type=int, nargs='+', default=[0, 1],
+                        help='invalid signatures planted per batch')
+    parser.add_argument('--backend', help='arithmetic backend (default: RSA_ARITHMETIC_BACKEND)')
+    args = parser.parse_args()
+
+    signer = RSADigitalSignature(execution_mode=PRODUCTION_MODE, backend=args.backend)
+    signer.generate_keypair('bench', args.bits // 2)
+    key = signer.users.get('bench')
+    verifier = signer.verifier_cache.get(key.n, key.e)
+
+    print(f"backend {signer.backend.name}, {args.bits}-bit key, e = {key.e}\n")
+    print(f"{'batch':>8} {'bad':>5} {'one-by-one s':>14} {'screened s':>12} {'speedup':>9}")
+    for size in args.sizes:
+        for bad in args.bad:
+            hashes, signatures, bad_indices = make_pairs(verifier, size, bad)
+            expected, individual = timed(one_by_one, verifier, hashes, signatures)
+            found, screened = timed(verifier.find_invalid, hashes, signatures)
+            assert found == expected == bad_indices, (found, expected, bad_indices)
+            print(f"{size:>8} {bad:>5} {individual:>14.4f} {screened:>12.4f} "
+                  f"{individual / screened:>8.1f}x", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Hammer concurrent key generation, signing, verification and listing
+
+    python -m benchmarks.concurrency_stress --threads 16 --users 32 --seconds 10
+    python -m benchmarks.concurrency_stress --shards 1          # one lock stripe
+    python -m benchmarks.concurrency_stress --key-store stress.db
+
+Worker threads pick a random user and regenerate its key, sign and
+verify a message, or list a page of users, all against one shared
+RSADigitalSignature. Correctness checks:
+
+- every record read has p * q == n and its private exponent inverts e
+- every signature matches the key it reports having used
+- a signature verifies whenever the user's key was not rotated in between
+- listings come back sorted, without duplicates, and with records behind
+  every username
+- no rotation is lost: each replaced key is seen by exactly one rotation
+
+Reports ops/sec per operation and exits with status 1 on any failure.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+
+from app import RSADigitalSignature
+from key_store import InMemoryKeyStore, SQLiteKeyStore
+from tracing import PRODUCTION_MODE
+
+OPERATIONS = ('generate', 'sign_verify', 'list')
+
+
+class Stress:
+    def __init__(self, rsa, usernames, bits, weights):
+        self.rsa = rsa
+        self.usernames = usernames
+        self.bits = bits
+        self.weights = weights
+        self.counts = Counter()
+        self.failures = []
+        self.replaced = Counter()  # Modulus -> times it was reported as replaced
+        self.created = set()  # Every modulus ever generated
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def fail(self, message):
+        with self.lock:
+            self.failures.append(message)
+
+    def check_record(self, username, record):
+        if record.p * record.q != record.n:
+            self.fail(f"{username}: record mixes key fields (p * q != n)")
+        elif pow(pow(12345, record.e, record.n), record.d, record.n) != 12345:
+            self.fail(f"{username}: private exponent does not match the public key")
+
+    def generate(self, username):
+        info = self.rsa.generate_keypair(username, self.bits // 2)
+        with self.lock:
+            self.created.add(info['public_key']['n'])
+
+    def sign_verify(self, username):
+        before = self.rsa.users.get(username)
+        self.check_record(username, before)
+        message = f'{username}-{random.getrandbits(64)}'
+
+        signed = self.rsa.sign_message(username, message)
+        details = signed['signing_details']
+        if pow(signed['signature'], before.e, details['private_key_n']) != details['hash_before_signing']:
+            self.fail(f"{username}: signature does not match the key it was made with")
+
+        verified = self.rsa.verify_signature(username, message, signed['signature'])
+        after = self.rsa.users.get(username)
+        if after is before and not verified['is_valid']:
+            self.fail(f"{username}: valid signature rejected with no rotation in between")
+
+    def list_page(self, _username):
+        after = random.choice(self.usernames)
+        page = list(self.rsa.users.iter_public_keys(after=after, limit=20))
+        names = [username for username, _ in page]
+        if names != sorted(set(names)) or (names and names[0] <= after):
+            self.fail(f"listing after {after!r} is out of order or repeats: {names}")
+
+    def worker(self):
+        actions = {'generate': self.generate, 'sign_verify': self.sign_verify, 'list': self.list_page}
+        local = Counter()
+        while not self.stop.is_set():
+            operation = random.choices(OPERATIONS, self.weights)[0]
+            try:
+                actions[operation](random.choice(self.usernames))
+            except Exception as e:
+                self.fail(f"{operation}: {type(e).__name__}: {e}")
+            local[operation] += 1
+        with self.lock:
+            self.counts.update(local)
+
+
+def run(threads, users, seconds, bits, weights, shards, key_store_path=None):
+    if key_store_path:
+        store = SQLiteKeyStore(key_store_path)
+    else:
+        store = InMemoryKeyStore(shards)
+    rsa = RSADigitalSignature(execution_mode=PRODUCTION_MODE, key_store=store)
+
+    # Count every key a rotation reports replacing
+    stress = Stress(rsa, [f'user-{index:04d}' for index in range(users)], bits, weights)
+    swap = store.swap
+
+    def counting_swap(username, record):
+        previous = swap(username, record)
+        if previous is not None:
+            with stress.lock:
+                stress.replaced[previous.n] += 1
+        return previous
+
+    store.swap = counting_swap
+    for username in stress.usernames:
+        stress.generate(username)
+
+    workers = [threading.Thread(target=stress.worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stress.stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Every key but the current ones was replaced, each exactly once
+    current = {store.get(username).n for username in stress.usernames}
+    for n in stress.created - current:
+        if stress.replaced[n] != 1:
+            stress.fail(f"key replaced {stress.replaced[n]} times instead of once")
+    if any(stress.replaced[n] for n in current):
+        stress.fail("a current key was reported as replaced")
+    return stress, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--users', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--bits', type=int, default=512, help='modulus size of generated keys')
+    parser.add_argument('--weights', type=float, nargs=3, default=[1, 8, 1],
+                        metavar=('GENERATE', 'SIGN_VERIFY', 'LIST'))
+    parser.add_argument('--shards', type=int, default=16, help='lock stripes of the in-memory store')
+    parser.add_argument('--key-store', help='stress a SQLite key store at this path instead')
+    args = parser.parse_args()
+
+    stress, elapsed = run(args.threads, args.users, args.seconds, args.bits, args.weights,
+                          args.shards, args.key_store)
+
+    store = f'SQLite {args.key_store}' if args.key_store else f'in memory, {args.shards} shards'
+    print(f"{args.threads} threads, {args.users} users, {args.bits}-bit keys, {store}")
+    for operation in OPERATIONS:
+        print(f"{operation:<12} {stress.counts[operation]:>8} ops {stress.counts[operation] / elapsed:>10.1f} ops/s")
+    total = sum(stress.counts.values())
+    print(f"{'total':<12} {total:>8} ops {total / elapsed:>10.1f} ops/s")
+
+    if stress.failures:
+        print(f"\n{len(stress.failures)} failure(s):")
+        for failure in stress.failures[:20]:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print("\nNo consistency failures")
+
+
+if __name__ == '__main__':
+    main()
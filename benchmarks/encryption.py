@@ -0,0 +1,96 @@
+"""Compare per-character, block and hybrid encryption throughput
+
+    python -m benchmarks.encryption --bits 2048 --sizes 1K,10K,100K,1M,10M,100M
+
+Per-character and block modes get slow quickly, so they only run up to
+--char-max and --block-max bytes; hybrid mode runs at every size when the
+optional cryptography package is installed, and is skipped otherwise.
+"""
+import argparse
+import time
+
+import session_cipher
+from RSA_CODE import BLOCK_MODE, CHAR_MODE, HYBRID_MODE, RSAAlgorithm
+from tracing import PRODUCTION_MODE
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(text):
+    """Parse sizes such as 512, 1K or 100M into bytes"""
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(text[:-1]) * UNITS[text[-1]]
+    return int(text)
+
+
+def ciphertext_size(mode, ciphertext, key_bytes):
+    """Bytes needed to transmit a ciphertext as raw big-endian blocks"""
+    if mode == HYBRID_MODE:
+        return key_bytes + len(ciphertext['ciphertext'])
+    return key_bytes * len(ciphertext)
+
+
+def measure(rsa, mode, size, public_key, private_key):
+    """Encrypt and decrypt `size` bytes once; return (encrypt s, decrypt s, expansion)"""
+    key_bytes = (public_key[0].bit_length() + 7) // 8
+    if mode == CHAR_MODE:
+        message = 'a' * size
+        encrypt = lambda: rsa.encrypt_message(message, public_key)
+        decrypt = lambda c: rsa.decrypt_message(c, private_key)
+    elif mode == BLOCK_MODE:
+        message = b'a' * size
+        encrypt = lambda: rsa.encrypt_bytes(message, public_key)
+        decrypt = lambda c: rsa.decrypt_bytes(c, private_key)
+    else:
+        message = b'a' * size
+        encrypt = lambda: rsa.encrypt_hybrid(message, public_key)
+        decrypt = lambda c: rsa.decrypt_hybrid(c, private_key)
+
+    start = time.perf_counter()
+    ciphertext = encrypt()
+    encrypt_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decrypt(ciphertext)
+    decrypt_seconds = time.perf_counter() - start
+
+    return encrypt_seconds, decrypt_seconds, ciphertext_size(mode, ciphertext, key_bytes) / size
+
+
+def run(bits, sizes, char_max, block_max):
+    """Return (mode, size, encrypt MB/s, decrypt MB/s, expansion) rows"""
+    rsa = RSAAlgorithm(execution_mode=PRODUCTION_MODE)
+    public_key, private_key = rsa.generate_keypair(bits // 2)
+
+    rows = []
+    for size in sizes:
+        for mode, limit in ((CHAR_MODE, char_max), (BLOCK_MODE, block_max), (HYBRID_MODE, None)):
+            if limit is not None and size > limit:
+                continue
+            if mode == HYBRID_MODE and not session_cipher.AVAILABLE:
+                continue
+            encrypt_seconds, decrypt_seconds, expansion = measure(
+                rsa, mode, size, public_key, private_key)
+            rows.append((mode, size, size / encrypt_seconds / 1e6,
+                         size / decrypt_seconds / 1e6, expansion))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, default=2048, help='modulus size')
+    parser.add_argument('--sizes', default='1K,10K,100K,1M,10M,100M')
+    parser.add_argument('--char-max', type=parse_size, default=parse_size('1K'))
+    parser.add_argument('--block-max', type=parse_size, default=parse_size('100K'))
+    args = parser.parse_args()
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+
+    print(f"{'mode':<8} {'bytes':>11} {'encrypt MB/s':>13} {'decrypt MB/s':>13} {'expansion':>10}")
+    for mode, size, encrypt_rate, decrypt_rate, expansion in run(
+            args.bits, sizes, args.char_max, args.block_max):
+        print(f"{mode:<8} {size:>11} {encrypt_rate:>13.4g} {decrypt_rate:>13.4g} {expansion:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Measure memory per user for nested-dict key records against KeyRecord
+
+    python -m benchmarks.key_memory --users 100000 --bits 2048
+
+Builds the same synthetic users twice, once as the three nested dicts
+generate_keypair used to store and once as compact KeyRecord objects,
+and reports the bytes each layout allocates per user. The integers are
+random values of the right sizes, since generating real key pairs for
+100k users would take hours; their memory cost is the same.
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from key_store import InMemoryKeyStore, KeyRecord
+
+
+def synthetic_keys(count, bits):
+    """Yield (username, n, e, d, p, q, dP, dQ, qInv) with integers sized like a real key"""
+    half = bits // 2
+    for index in range(count):
+        p = random.getrandbits(half) | (1 << (half - 1)) | 1
+        q = random.getrandbits(half) | (1 << (half - 1)) | 1
+        yield (f'user-{index:08d}', p * q, 65537, random.getrandbits(bits),
+               p, q, random.getrandbits(half), random.getrandbits(half), random.getrandbits(half))
+
+
+def dict_record(n, e, d, p, q, dP, dQ, qInv):
+    """The nested-dict layout generate_keypair stored before KeyRecord"""
+    # e is built at run time, as it is in generate_keypair, so each record owns one
+    e = int(str(e))
+    return {
+        'public_key': {'n': n, 'e': e},
+        'private_key': {'n': n, 'd': d, 'p': p, 'q': q, 'dP': dP, 'dQ': dQ, 'qInv': qInv},
+        'key_details': {'p': p, 'q': q, 'phi_n': (p - 1) * (q - 1)},
+    }
+
+
+def measure(build, keys):
+    """Bytes allocated by build(keys) and still held afterwards"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    held = build(keys)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def build_dicts(keys):
+    return {username: dict_record(*values) for username, *values in keys}
+
+
+def build_records(keys):
+    store = InMemoryKeyStore()
+    for username, n, e, d, p, q, dP, dQ, qInv in keys:
+        store[username] = KeyRecord(n, int(str(e)), d, p, q, dP, dQ, qInv)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--bits', type=int, default=2048, help='modulus size')
+    args = parser.parse_args()
+
+    # The key integers are created up front and shared by both layouts, so
+    # each measurement covers the record structure plus the values it derives
+    keys = list(synthetic_keys(args.users, args.bits))
+    key_bytes = sum(sum(value.__sizeof__() for value in values[1:]) for values in keys) / args.users
+    dict_bytes = measure(build_dicts, keys) / args.users
+    record_bytes = measure(build_records, keys) / args.users
+
+    print(f"{args.users} users, {args.bits}-bit keys")
+    print(f"{'key integers (shared)':<28} {key_bytes:>10.0f} bytes/user")
+    print(f"{'nested dicts':<28} {dict_bytes:>10.0f} bytes/user  (total {dict_bytes + key_bytes:.0f})")
+    print(f"{'KeyRecord in InMemoryKeyStore':<28} {record_bytes:>10.0f} bytes/user  (total {record_bytes + key_bytes:.0f})")
+    print(f"{'saved':<28} {dict_bytes - record_bytes:>10.0f} bytes/user  "
+          f"({(dict_bytes - record_bytes) / (dict_bytes + key_bytes):.0%} of the total)")
+
+
+if __name__ == '__main__':
+    main()
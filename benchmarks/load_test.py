@@ -0,0 +1,157 @@
+"""Compare sign/verify latency of running servers under concurrent load
+
+Start each server first, in production mode so the responses carry no trace:
+
+    RSA_EXECUTION_MODE=production flask --app app run --with-threads --port 5000
+    RSA_EXECUTION_MODE=production hypercorn asgi:application --bind 127.0.0.1:8000
+
+then point the harness at them:
+
+    python -m benchmarks.load_test --target flask=http://127.0.0.1:5000 \\
+        --target asgi=http://127.0.0.1:8000 --clients 32 --requests 2000
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+USERNAME = 'loadtest'
+
+
+class Client:
+    """One keep-alive HTTP connection that posts JSON"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                            else http.client.HTTPConnection)
+        self.connection = connection_class(parts.hostname, parts.port, timeout=60)
+
+    def post(self, path, payload):
+        """Send a request and return (status, decoded body)"""
+        self.connection.request('POST', path, json.dumps(payload),
+                                {'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def close(self):
+        self.connection.close()
+
+
+def prepare(url, bits, message):
+    """Create the load-test key on a server and return a signature to verify"""
+    client = Client(url)
+    try:
+        status, body = client.post('/api/generate-keys', {'username': USERNAME, 'bits': bits // 2})
+        if status != 200:
+            raise RuntimeError(f"{url}: key generation failed: {body.get('error')}")
+        status, body = client.post('/api/sign-message', {'username': USERNAME, 'message': message})
+        if status != 200:
+            raise RuntimeError(f"{url}: signing failed: {body.get('error')}")
+        return body['data']['signature']
+    finally:
+        client.close()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_target(url, bits, clients, requests, message):
+    """Alternate sign and verify requests from `clients` threads; return a stats dict"""
+    signature = prepare(url, bits, message)
+    operations = [
+        ('/api/sign-message', {'username': USERNAME, 'message': message}),
+        ('/api/verify-signature', {'username': USERNAME, 'message': message,
+                                   'signature': signature}),
+    ]
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        client = Client(url)
+        local_latencies = []
+        local_errors = 0
+        try:
+            while True:
+                with lock:
+                    index = next(remaining, None)
+                if index is None:
+                    break
+                path, payload = operations[index % len(operations)]
+                start = time.perf_counter()
+                try:
+                    status, _ = client.post(path, payload)
+                except (OSError, http.client.HTTPException, ValueError):
+                    status = None
+                    client.close()  # Reconnect on the next request
+                local_latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    local_errors += 1
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else float('nan'),
+    }
+
+
+def run(targets, bits, clients, requests, message='load test message'):
+    """Return (name, stats) rows, one per target"""
+    return [(name, run_target(url, bits, clients, requests, message))
+            for name, url in targets]
+
+
+def parse_target(value):
+    name, sep, url = value.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError("Targets look like name=http://host:port")
+    return name, url.rstrip('/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', type=parse_target, action='append', required=True,
+                        help='name=base URL of a running server, may be repeated')
+    parser.add_argument('--bits', type=int, default=2048, help='modulus size of the test key')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'target':<12} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for name, stats in run(args.target, args.bits, args.clients, args.requests):
+        print(f"{name:<12} {stats['requests']:>9} {stats['errors']:>7} "
+              f"{stats['requests_per_second']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['mean_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Compare the incremental sieve prime search with the redraw-per-candidate loop
+
+    python -m benchmarks.prime_search --bits 512 1024 2048 3072 --samples 5
+"""
+import argparse
+import random
+import time
+
+from primality import IncrementalPrimeSearch, is_probable_prime
+
+
+def redraw_loop(bits):
+    """The previous generate_prime loop: a fresh random draw per candidate"""
+    tested = 0
+    while True:
+        num = random.randint(2**(bits-1), 2**bits - 1)
+        tested += 1
+        if is_probable_prime(num, rounds=None):
+            return num, tested
+
+
+def incremental_search(bits):
+    """One random start, stepping forward through sieved windows"""
+    search = IncrementalPrimeSearch(bits)
+    prime = search.next_prime()
+    return prime, search.candidates_tested
+
+
+def run(bits_list, samples):
+    """Time both strategies and return one result row per (strategy, bits)"""
+    results = []
+    for bits in bits_list:
+        for name, strategy in (('redraw', redraw_loop), ('incremental', incremental_search)):
+            total_time = 0.0
+            total_tested = 0
+            for _ in range(samples):
+                start = time.perf_counter()
+                prime, tested = strategy(bits)
+                total_time += time.perf_counter() - start
+                total_tested += tested
+                assert prime.bit_length() == bits
+            results.append({
+                'strategy': name,
+                'bits': bits,
+                'candidates_per_prime': total_tested / samples,
+                'seconds_per_prime': total_time / samples,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, nargs='+', default=[512, 1024, 2048, 3072])
+    parser.add_argument('--samples', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'strategy':<12} {'bits':>6} {'tested/prime':>14} {'ms/prime':>12}")
+    for row in run(args.bits, args.samples):
+        print(f"{row['strategy']:<12} {row['bits']:>6} "
+              f"{row['candidates_per_prime']:>14.1f} {row['seconds_per_prime'] * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Measure signing throughput of the process pool from 1 to N workers
+
+    python -m benchmarks.signing_pool --bits 2048 --signatures 400 --max-workers 8
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import RSADigitalSignature
+from signing_pool import SigningPool
+from tracing import PRODUCTION_MODE
+
+
+def make_user(bits):
+    """Generate one key and return (rsa, username, user record)"""
+    rsa = RSADigitalSignature(execution_mode=PRODUCTION_MODE)
+    rsa.generate_keypair('bench', bits // 2)
+    return rsa, 'bench', rsa.users['bench']
+
+
+def sign_all(sign, user, signatures, threads):
+    """Sign random hashes from several client threads; return signatures per second"""
+    n = user.n
+    hashes = [random.randrange(n) for _ in range(signatures)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as clients:
+        list(clients.map(sign, hashes))
+    return signatures / (time.perf_counter() - start)
+
+
+def run(bits, signatures, max_workers):
+    """Return (label, workers, signatures per second) rows, in-process first"""
+    rsa, username, user = make_user(bits)
+    rows = [('in-process', 1, sign_all(
+        lambda h: rsa.private_key_op(h, user),
+        user, signatures, 1))]
+
+    workers = 1
+    while workers <= max_workers:
+        pool = SigningPool(RSADigitalSignature, max_workers=workers)
+        try:
+            sign = lambda h: pool.sign(username, user, h)
+            # Warm up so every worker has started and loaded the key
+            sign_all(sign, user, workers * 4, workers * 2)
+            rows.append(('pool', workers, sign_all(sign, user, signatures, workers * 2)))
+        finally:
+            pool.shutdown()
+        workers *= 2
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, default=2048)
+    parser.add_argument('--signatures', type=int, default=400)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'workers':>8} {'signatures/s':>14}")
+    for label, workers, rate in run(args.bits, args.signatures, args.max_workers):
+        print(f"{label:<12} {workers:>8} {rate:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
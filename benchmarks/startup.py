@@ -0,0 +1,93 @@
+"""Check the production launcher's time to first request against a target
+
+    python -m benchmarks.startup --runs 5 --target-ms 1000 [--include-dev]
+
+Each run starts `serve.py` on a free port and polls /api/health until it
+answers. The median over all runs is compared with --target-ms, and the
+command exits with status 1 when it is slower, so it can gate a deploy.
+--include-dev also times `python app.py` (debug server with reloader on
+port 5000) for comparison.
+"""
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    """Ask the OS for a port nobody is listening on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(command, port, timeout):
+    """Start a server and return seconds until /api/health first answers 200"""
+    env = dict(os.environ, RSA_EXECUTION_MODE='production')
+    start = time.perf_counter()
+    # A session of its own, so a reloader's child process is stopped too
+    process = subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            try:
+                connection.request('GET', '/api/health')
+                if connection.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+            finally:
+                connection.close()
+        raise RuntimeError(f"No response within {timeout} seconds")
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+
+def run(runs, timeout=30.0, include_dev=False):
+    """Return {launcher: [seconds per run]}"""
+    results = {'serve.py': []}
+    for _ in range(runs):
+        port = free_port()
+        results['serve.py'].append(time_to_first_request(
+            [sys.executable, 'serve.py', '--port', str(port)], port, timeout))
+
+    if include_dev:
+        results['app.py'] = [time_to_first_request([sys.executable, 'app.py'], 5000, timeout)
+                             for _ in range(runs)]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=1000.0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--include-dev', action='store_true')
+    args = parser.parse_args()
+
+    results = run(args.runs, args.timeout, args.include_dev)
+    print(f"{'launcher':<10} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for launcher, seconds in results.items():
+        print(f"{launcher:<10} {statistics.median(seconds) * 1000:>10.1f} "
+              f"{min(seconds) * 1000:>10.1f} {max(seconds) * 1000:>10.1f}")
+
+    median_ms = statistics.median(results['serve.py']) * 1000
+    if median_ms > args.target_ms:
+        print(f"\nFAIL: time to first request {median_ms:.1f} ms exceeds target {args.target_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\nOK: time to first request {median_ms:.1f} ms is within target {args.target_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
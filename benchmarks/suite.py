@@ -0,0 +1,220 @@
+"""Benchmark every RSA primitive across key and message sizes
+
+    python -m benchmarks.suite --bits 1024 2048 --message-sizes 64 1024 65536 \\
+        --output results.json
+    python -m benchmarks.suite --baseline results.json --threshold 0.10
+
+Each case reports ops/sec, per-operation p50/p99 latency and peak memory
+allocated by one operation. --output writes the results as JSON;
+--baseline compares against a saved run, flags every case whose ops/sec
+dropped by more than --threshold and exits with status 1 if any did.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import session_cipher
+from app import RSADigitalSignature
+from arithmetic import get_backend
+from RSA_CODE import RSAAlgorithm
+from primality import find_prime
+from tracing import PRODUCTION_MODE
+
+# Per-character and block encryption cost one private-key operation per
+# character or block, so they only run on messages up to these sizes
+CHAR_MESSAGE_MAX = 64
+BLOCK_MESSAGE_MAX = 1024
+
+
+def key_cases(signer, bits):
+    """Cases that depend only on the key size"""
+    user = signer.users['bench']
+    n, e, d, p, q = user.n, user.e, user.d, user.p, user.q
+    base = random.randrange(2, n)
+
+    return [
+        ('generate_prime', lambda: find_prime(bits // 2)),
+        ('generate_keypair', lambda: signer.generate_keypair('keygen', bits // 2)),
+        ('power_mod_public', lambda: signer.power_mod(base, e, n)),
+        ('power_mod_private', lambda: signer.power_mod(base, d, n)),
+        ('extended_gcd', lambda: signer.extended_gcd(q, p)),
+        ('mod_inverse', lambda: signer.mod_inverse(q, p)),
+    ]
+
+
+def message_cases(signer, encryptor, size):
+    """Cases that depend on the key and the message size"""
+    user = signer.users['bench']
+    public_key = (user.n, user.e)
+    private_key = (user.n, user.d)
+    message = 'a' * size
+    data = message.encode('utf-8')
+    signature = signer.sign_message('bench', message)['signature']
+
+    cases = [
+        ('hash_message', lambda: signer.hash_message(message)),
+        ('sign_message', lambda: signer.sign_message('bench', message)),
+        ('verify_signature', lambda: signer.verify_signature('bench', message, signature)),
+    ]
+
+    if size <= CHAR_MESSAGE_MAX:
+        ciphertext = encryptor.encrypt(message, public_key)
+        cases.append(('encrypt_char', lambda: encryptor.encrypt(message, public_key)))
+        cases.append(('decrypt_char', lambda: encryptor.decrypt(ciphertext, private_key)))
+
+    if size <= BLOCK_MESSAGE_MAX:
+        blocks = encryptor.encrypt_bytes(data, public_key)
+        cases.append(('encrypt_block', lambda: encryptor.encrypt_bytes(data, public_key)))
+        cases.append(('decrypt_block', lambda: encryptor.decrypt_bytes(blocks, private_key)))
+
+    if session_cipher.AVAILABLE:
+        envelope = encryptor.encrypt_hybrid(data, public_key)
+        cases.append(('encrypt_hybrid', lambda: encryptor.encrypt_hybrid(data, public_key)))
+        cases.append(('decrypt_hybrid', lambda: encryptor.decrypt_hybrid(envelope, private_key)))
+    return cases
+
+
+def build_cases(bits_list, message_sizes, backend=None):
+    """Yield (name, params, operation) for every case in the sweep"""
+    for bits in bits_list:
+        signer = RSADigitalSignature(execution_mode=PRODUCTION_MODE, backend=backend)
+        signer.generate_keypair('bench', bits // 2)
+        encryptor = RSAAlgorithm(execution_mode=PRODUCTION_MODE, backend=backend)
+
+        for name, operation in key_cases(signer, bits):
+            yield name, {'bits': bits}, operation
+        for size in message_sizes:
+            for name, operation in message_cases(signer, encryptor, size):
+                yield name, {'bits': bits, 'message_bytes': size}, operation
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(operation, min_time, min_iterations):
+    """Time an operation repeatedly; return ops/sec, latency percentiles and peak memory"""
+    operation()  # Warm-up, so caches and lazy imports are not timed
+
+    durations = []
+    total = 0.0
+    while total < min_time or len(durations) < min_iterations:
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+        durations.append(elapsed)
+        total += elapsed
+
+    # tracemalloc slows allocation down, so memory is measured on a separate call
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    return {
+        'iterations': len(durations),
+        'ops_per_sec': len(durations) / total,
+        'p50_ms': percentile(durations, 0.50) * 1000,
+        'p99_ms': percentile(durations, 0.99) * 1000,
+        'peak_memory_bytes': peak,
+    }
+
+
+def case_key(name, params):
+    """Stable identifier of a case, used to match runs against a baseline"""
+    return f"{name}[{','.join(f'{key}={value}' for key, value in sorted(params.items()))}]"
+
+
+def run(bits_list, message_sizes, min_time=1.0, min_iterations=3, only=None, backend=None):
+    """Run the suite; returns a JSON-serializable report"""
+    results = []
+    for name, params, operation in build_cases(bits_list, message_sizes, backend):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        result = {'case': case_key(name, params), 'name': name, 'params': params,
+                  **measure(operation, min_time, min_iterations)}
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'backend': get_backend(backend).name,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Return (case, baseline ops/sec, current ops/sec, change, regressed) rows"""
+    baseline_results = {result['case']: result for result in baseline['results']}
+    rows = []
+    for result in report['results']:
+        previous = baseline_results.get(result['case'])
+        if previous is None:
+            continue
+        change = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        rows.append((result['case'], previous['ops_per_sec'], result['ops_per_sec'],
+                     change, change < -threshold))
+    return rows
+
+
+def format_result(result):
+    return (f"{result['case']:<48} {result['ops_per_sec']:>12.2f} ops/s "
+            f"p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms  "
+            f"peak {result['peak_memory_bytes'] / 1024:>10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bits', type=int, nargs='+', default=[1024, 2048],
+                        help='modulus sizes to sweep')
+    parser.add_argument('--message-sizes', type=int, nargs='+', default=[64, 1024, 65536],
+                        help='message sizes in bytes to sweep')
+    parser.add_argument('--min-time', type=float, default=1.0,
+                        help='seconds to spend timing each case')
+    parser.add_argument('--min-iterations', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='run only cases whose name contains one of these')
+    parser.add_argument('--backend', help='arithmetic backend (default: RSA_ARITHMETIC_BACKEND)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='ops/sec drop that counts as a regression (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    report = run(args.bits, args.message_sizes, args.min_time, args.min_iterations,
+                 args.only, args.backend)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print(f"\n{'case':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+        for case, previous, current, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{case:<48} {previous:>12.2f} {current:>12.2f} {change:>+8.1%}{flag}")
+
+        regressions = sum(1 for row in rows if row[4])
+        if regressions:
+            print(f"\n{regressions} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} across {len(rows)} cases")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from primality import find_prime
+
+# Window used to report the recent refill rate
+REFILL_RATE_WINDOW = 60.0
+
+
+def generate_prime_pair(bits):
+    """Generate two distinct primes of the given size (runs in a worker process)"""
+    p = find_prime(bits)
+    q = find_prime(bits)
+    while p == q:
+        q = find_prime(bits)
+    return p, q
+
+
+class KeyPool:
+    """Pool of pre-generated prime pairs per bit size, refilled in the background
+
+    Prime generation is the expensive part of key generation, so worker
+    processes keep between `low_watermark` and `high_watermark` ready pairs
+    for each pooled bit size. Once a pool drops below the low watermark it
+    is topped back up to the high watermark.
+    """
+
+    def __init__(self, bit_sizes=(512, 1024, 2048), low_watermark=2,
+                 high_watermark=8, max_workers=None):
+        if low_watermark < 0 or high_watermark < max(low_watermark, 1):
+            raise ValueError("Watermarks must satisfy 0 <= low <= high and high >= 1")
+
+        self.bit_sizes = frozenset(bit_sizes)
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_workers = max_workers
+
+        # Re-entrant because a job that is already done runs its callback
+        # straight away inside _schedule_refill
+        self._lock = threading.RLock()
+        self._executor = None
+        self._pools = {bits: deque() for bits in self.bit_sizes}
+        self._in_flight = {bits: 0 for bits in self.bit_sizes}
+        self._stats = {
+            bits: {'hits': 0, 'misses': 0, 'generated': 0, 'failed': 0}
+            for bits in self.bit_sizes
+        }
+        self._completed_at = {bits: deque() for bits in self.bit_sizes}
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from RSA_KEY_POOL_* environment variables"""
+        bit_sizes = os.environ.get('RSA_KEY_POOL_BITS', '512,1024,2048')
+        workers = os.environ.get('RSA_KEY_POOL_WORKERS')
+        return cls(
+            bit_sizes=[int(bits) for bits in bit_sizes.split(',') if bits.strip()],
+            low_watermark=int(os.environ.get('RSA_KEY_POOL_LOW', 2)),
+            high_watermark=int(os.environ.get('RSA_KEY_POOL_HIGH', 8)),
+            max_workers=int(workers) if workers else None,
+        )
+
+    def take(self, bits):
+        """Pop a ready (p, q) pair, or return None if the pool is empty"""
+        if bits not in self.bit_sizes:
+            return None
+
+        with self._lock:
+            pool = self._pools[bits]
+            if pool:
+                pair = pool.popleft()
+                self._stats[bits]['hits'] += 1
+            else:
+                pair = None
+                self._stats[bits]['misses'] += 1
+            self._schedule_refill(bits)
+
+        return pair
+
+    def warm(self, bit_sizes=None):
+        """Start filling the pools without waiting for the first request"""
+        with self._lock:
+            for bits in bit_sizes or self.bit_sizes:
+                if bits in self.bit_sizes:
+                    self._schedule_refill(bits)
+
+    def _schedule_refill(self, bits):
+        """Submit refill jobs if the pool is below its low watermark (lock held)"""
+        available = len(self._pools[bits]) + self._in_flight[bits]
+        if available >= max(self.low_watermark, 1):
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        for _ in range(self.high_watermark - available):
+            future = self._executor.submit(generate_prime_pair, bits)
+            self._in_flight[bits] += 1
+            future.add_done_callback(
+                lambda future, bits=bits: self._on_generated(bits, future)
+            )
+
+    def _on_generated(self, bits, future):
+        """Store a finished pair coming back from a worker"""
+        with self._lock:
+            self._in_flight[bits] -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._stats[bits]['failed'] += 1
+                return
+
+            self._pools[bits].append(future.result())
+            self._stats[bits]['generated'] += 1
+            self._completed_at[bits].append(time.monotonic())
+
+    def _refill_rate(self, bits, now):
+        """Pairs generated per second over the recent window (lock held)"""
+        completed = self._completed_at[bits]
+        while completed and now - completed[0] > REFILL_RATE_WINDOW:
+            completed.popleft()
+        return len(completed) / REFILL_RATE_WINDOW
+
+    def stats(self):
+        """Return pool depth, refill rate and hit/miss counts per bit size"""
+        now = time.monotonic()
+        with self._lock:
+            pools = {}
+            for bits in sorted(self.bit_sizes):
+                pools[bits] = {
+                    'depth': len(self._pools[bits]),
+                    'in_flight': self._in_flight[bits],
+                    'refill_rate_per_second': self._refill_rate(bits, now),
+                    **self._stats[bits],
+                }
+            return {
+                'low_watermark': self.low_watermark,
+                'high_watermark': self.high_watermark,
+                'pools': pools,
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,428 @@
+import bisect
+import heapq
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Integer columns of a stored key record
+COLUMNS = ('n', 'e', 'd', 'p', 'q', 'phi_n', 'dP', 'dQ', 'qInv')
+
+# Lock stripes of an InMemoryKeyStore
+DEFAULT_SHARDS = 16
+
+# Public exponents shared by nearly every key, stored as one int object each
+_COMMON_EXPONENTS = {e: e for e in (3, 17, 65537)}
+
+
+class KeyRecord:
+    """One user's key material, held compactly
+
+    The integers live in slots instead of three nested dicts, n is held
+    once, phi_n is recomputed from p and q when asked for, and common
+    public exponents are shared between records. Key operations read the
+    attributes directly. Indexing a record with 'public_key', 'private_key'
+    or 'key_details' builds a new dict in the shape
+    RSADigitalSignature.generate_keypair has always produced; that view is
+    meant for JSON output and for older code reading records as dicts.
+    """
+
+    __slots__ = ('n', 'e', 'd', 'p', 'q', 'dP', 'dQ', 'qInv')
+
+    def __init__(self, n, e, d, p, q, dP=None, dQ=None, qInv=None):
+        self.n = n
+        self.e = _COMMON_EXPONENTS.get(e, e)
+        self.d = d
+        self.p = p
+        self.q = q
+        self.dP = dP
+        self.dQ = dQ
+        self.qInv = qInv
+
+    @classmethod
+    def from_dict(cls, record):
+        """Build a record from the nested-dict form"""
+        private_key = record['private_key']
+        return cls(
+            record['public_key']['n'], record['public_key']['e'], private_key['d'],
+            private_key.get('p', record['key_details']['p']),
+            private_key.get('q', record['key_details']['q']),
+            private_key.get('dP'), private_key.get('dQ'), private_key.get('qInv'),
+        )
+
+    @property
+    def phi_n(self):
+        return (self.p - 1) * (self.q - 1)
+
+    def public_key(self):
+        return {'n': self.n, 'e': self.e}
+
+    def private_key(self):
+        private_key = {'n': self.n, 'd': self.d, 'p': self.p, 'q': self.q}
+        if self.dP is not None:
+            private_key.update(dP=self.dP, dQ=self.dQ, qInv=self.qInv)
+        return private_key
+
+    def key_details(self):
+        return {'p': self.p, 'q': self.q, 'phi_n': self.phi_n}
+
+    def __getitem__(self, part):
+        if part not in _RECORD_PARTS:
+            raise KeyError(part)
+        return getattr(self, part)()
+
+    def get(self, part, default=None):
+        return self[part] if part in _RECORD_PARTS else default
+
+    def to_dict(self):
+        return {part: self[part] for part in _RECORD_PARTS}
+
+    def __repr__(self):
+        return f"KeyRecord(n={self.n.bit_length()} bits, e={self.e})"
+
+
+_RECORD_PARTS = ('public_key', 'private_key', 'key_details')
+
+
+class KeyStore(ABC):
+    """Mapping-style interface for storing user key records
+
+    Records are KeyRecord objects. A record given in the nested-dict form
+
+        {'public_key': {...}, 'private_key': {...}, 'key_details': {...}}
+
+    is converted on the way in.
+    """
+
+    @abstractmethod
+    def get(self, username, default=None):
+        """Return the record stored for a username, or `default`"""
+
+    @abstractmethod
+    def __setitem__(self, username, record):
+        """Store a record, replacing any previous one"""
+
+    def swap(self, username, record):
+        """Store a record and return the one it replaced, or None for a new user
+
+        Stores that can do so make the exchange atomic, so when two
+        rotations of one user race, each sees the other's record as the
+        previous one and no replaced key is missed.
+        """
+        previous = self.get(username)
+        self[username] = record
+        return previous
+
+    @abstractmethod
+    def items(self):
+        """Iterate over (username, record) pairs in username order"""
+
+    @abstractmethod
+    def iter_public_keys(self, prefix='', after=None, limit=None):
+        """Iterate over (username, public_key) in username order
+
+        Only usernames starting with `prefix` and sorting after `after`
+        are returned, at most `limit` of them.
+        """
+
+    @property
+    @abstractmethod
+    def version(self):
+        """Counter that changes whenever any record is written"""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of stored records"""
+
+    def __getitem__(self, username):
+        record = self.get(username)
+        if record is None:
+            raise KeyError(username)
+        return record
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    def __iter__(self):
+        return (username for username, _ in self.items())
+
+
+class _Shard:
+    """One stripe of an InMemoryKeyStore: its records, sorted usernames and writer lock"""
+
+    __slots__ = ('records', 'usernames', 'lock', 'version')
+
+    def __init__(self):
+        self.records = {}
+        self.usernames = []  # Kept sorted for cursor and prefix lookups
+        self.lock = threading.Lock()
+        self.version = 0
+
+
+class InMemoryKeyStore(KeyStore):
+    """Key records held in dicts inside this process, split into lock-striped shards
+
+    Lookups take no lock. A lookup is one dict access, and a rotated key
+    replaces the whole KeyRecord in a single assignment, so a reader sees
+    the old record or the new one and never a mix of the two. Writers lock
+    only the shard their username hashes to. Listings hold each shard's
+    lock just long enough to copy one page of its sorted usernames.
+    """
+
+    def __init__(self, shards=DEFAULT_SHARDS):
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, username):
+        return self._shards[hash(username) % len(self._shards)]
+
+    def get(self, username, default=None):
+        return self._shard(username).records.get(username, default)
+
+    def swap(self, username, record):
+        if not isinstance(record, KeyRecord):
+            record = KeyRecord.from_dict(record)
+        shard = self._shard(username)
+        with shard.lock:
+            previous = shard.records.get(username)
+            # The record goes in before the username, so listings never
+            # see a username whose record is missing
+            shard.records[username] = record
+            if previous is None:
+                bisect.insort(shard.usernames, username)
+            shard.version += 1
+        return previous
+
+    def __setitem__(self, username, record):
+        self.swap(username, record)
+
+    def items(self):
+        snapshots = []
+        for shard in self._shards:
+            with shard.lock:
+                snapshots.append(list(shard.usernames))
+        return ((username, self.get(username)) for username in heapq.merge(*snapshots))
+
+    def iter_public_keys(self, prefix='', after=None, limit=None):
+        pages = []
+        for shard in self._shards:
+            with shard.lock:
+                usernames = shard.usernames
+                start = bisect.bisect_left(usernames, prefix)
+                if after is not None:
+                    start = max(start, bisect.bisect_right(usernames, after))
+                end = None if limit is None else start + limit
+                pages.append(usernames[start:end])
+
+        count = 0
+        for username in heapq.merge(*pages):
+            if count == limit or not username.startswith(prefix):
+                break
+            yield username, self.get(username).public_key()
+            count += 1
+
+    @property
+    def version(self):
+        # Each shard's counter only grows, so their sum does too
+        return sum(shard.version for shard in self._shards)
+
+    def __len__(self):
+        return sum(len(shard.records) for shard in self._shards)
+
+
+def record_to_row(record):
+    """Flatten a key record into column values (integers stored as hex text)"""
+    values = (getattr(record, column) for column in COLUMNS)
+    return tuple(format(value, 'x') if value is not None else None for value in values)
+
+
+def row_to_record(row):
+    """Rebuild a key record from stored column values (phi_n is recomputed)"""
+    values = {column: int(value, 16)
+              for column, value in zip(COLUMNS, row) if value is not None}
+    return KeyRecord(values['n'], values['e'], values['d'], values['p'], values['q'],
+                     values.get('dP'), values.get('dQ'), values.get('qInv'))
+
+
+class SQLiteKeyStore(KeyStore):
+    """Key records persisted in SQLite with an in-process LRU cache in front
+
+    The database runs in WAL mode, so several worker processes can share
+    one file: readers never block each other and writers are serialized by
+    SQLite. Each thread gets its own connection. A commit from any other
+    connection changes SQLite's data_version, which clears the LRU cache
+    so a key regenerated by another worker is never served stale.
+
+    Every clear and every local write bumps a cache generation. A reader
+    only caches the row it fetched if the generation is unchanged since it
+    missed, so a read racing a rotation cannot put the replaced key back.
+    """
+
+    def __init__(self, path, cache_size=1024, timeout=30.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        with self._connection() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    {', '.join(f'{column} TEXT' for column in COLUMNS)}
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+
+    @classmethod
+    def from_env(cls):
+        """Build a store from RSA_KEY_STORE_PATH and RSA_KEY_STORE_CACHE_SIZE"""
+        return cls(
+            os.environ['RSA_KEY_STORE_PATH'],
+            cache_size=int(os.environ.get('RSA_KEY_STORE_CACHE_SIZE', 1024)),
+        )
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.data_version = None
+        return conn
+
+    def _check_external_writes(self, conn):
+        """Drop cached records if another connection has committed since last check"""
+        data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self._local.data_version:
+            if self._local.data_version is not None:
+                with self._cache_lock:
+                    self._cache.clear()
+                    self._cache_generation += 1
+            self._local.data_version = data_version
+
+    def _cache_put(self, username, record):
+        """Insert a record; the caller must hold _cache_lock"""
+        self._cache[username] = record
+        self._cache.move_to_end(username)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, username, default=None):
+        conn = self._connection()
+        self._check_external_writes(conn)
+
+        with self._cache_lock:
+            record = self._cache.get(username)
+            if record is not None:
+                self._cache.move_to_end(username)
+                self.cache_hits += 1
+                return record
+            self.cache_misses += 1
+            generation = self._cache_generation
+
+        row = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+        if row is None:
+            return default
+
+        record = row_to_record(row)
+        with self._cache_lock:
+            # A write since the miss may have made this row stale
+            if self._cache_generation == generation:
+                self._cache_put(username, record)
+        return record
+
+    def swap(self, username, record):
+        if not isinstance(record, KeyRecord):
+            record = KeyRecord.from_dict(record)
+        conn = self._connection()
+        with conn:
+            # Take the write lock before reading, so the read and the
+            # write are one step for every thread and process
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM users WHERE username = ?",
+                (username,)
+            ).fetchone()
+            conn.execute(
+                f"INSERT OR REPLACE INTO users (username, {', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                (username, *record_to_row(record))
+            )
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._cache_put(username, record)
+        return row_to_record(row) if row is not None else None
+
+    def __setitem__(self, username, record):
+        self.swap(username, record)
+
+    def items(self):
+        rows = self._connection().execute(
+            f"SELECT username, {', '.join(COLUMNS)} FROM users ORDER BY username"
+        )
+        for username, *row in rows:
+            yield username, row_to_record(row)
+
+    def iter_public_keys(self, prefix='', after=None, limit=None):
+        # Prefix and cursor both become ranges on the primary key index
+        conditions = ['username >= ?']
+        params = [prefix]
+        if prefix:
+            conditions.append('username < ?')
+            params.append(prefix + '\U0010ffff')
+        if after is not None:
+            conditions.append('username > ?')
+            params.append(after)
+        params.append(-1 if limit is None else limit)
+
+        rows = self._connection().execute(
+            f"SELECT username, n, e FROM users WHERE {' AND '.join(conditions)} "
+            f"ORDER BY username LIMIT ?",
+            params
+        )
+        for username, n, e in rows:
+            yield username, {'n': int(n, 16), 'e': int(e, 16)}
+
+    @property
+    def version(self):
+        return self._connection().execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()[0]
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def cache_stats(self):
+        """Return LRU cache size and hit/miss counts"""
+        with self._cache_lock:
+            return {
+                'size': len(self._cache),
+                'capacity': self.cache_size,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+            }
+
+
+def key_store_from_env():
+    """Use SQLite when RSA_KEY_STORE_PATH is set, otherwise keep keys in memory"""
+    if os.environ.get('RSA_KEY_STORE_PATH'):
+        return SQLiteKeyStore.from_env()
+    return InMemoryKeyStore()
@@ -0,0 +1,117 @@
+"""Merkle trees for aggregate signing (the RFC 9162 tree hash with SHA-256)
+
+A batch of messages is hashed into a tree, only the root is signed, and
+each message travels with an inclusion proof: the sibling hashes on the
+path from its leaf to the root, log2(N) of them for N messages.
+
+Leaves and interior nodes are hashed with different prefix bytes, so a
+leaf can never be passed off as an interior node. An unpaired last node
+moves up a level unchanged, which builds the same tree as RFC 9162, so
+a proof is checked with the batch size and the leaf index alone.
+
+What gets signed is root_digest(root, size), which also binds the batch
+size and starts with a 0xff byte that never occurs in UTF-8 text, so an
+aggregate signature is never also a valid signature of a text message.
+"""
+import hashlib
+
+HASH_LENGTH = hashlib.sha256().digest_size
+
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+_ROOT_PREFIX = b'\xffrsa-merkle-root'
+
+
+def leaf_hash(data):
+    """Hash one message's bytes into a leaf"""
+    return hashlib.sha256(_LEAF_PREFIX + data).digest()
+
+
+def node_hash(left, right):
+    """Hash two child nodes into their parent"""
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def root_digest(root, size):
+    """Digest of a tree root and its leaf count, the value an aggregate signature covers"""
+    return hashlib.sha256(_ROOT_PREFIX + size.to_bytes(8, 'big') + root).digest()
+
+
+class MerkleTree:
+    """Every level of a tree built over a list of leaf hashes, leaves first"""
+
+    __slots__ = ('levels',)
+
+    def __init__(self, leaves):
+        if not leaves:
+            raise ValueError("A Merkle tree needs at least one leaf")
+
+        level = list(leaves)
+        self.levels = [level]
+        while len(level) > 1:
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            level = parents
+            self.levels.append(level)
+
+    @classmethod
+    def from_messages(cls, messages):
+        """Build a tree over raw message bytes"""
+        return cls([leaf_hash(message) for message in messages])
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    @property
+    def size(self):
+        return len(self.levels[0])
+
+    def proof(self, index):
+        """Sibling hashes from leaf `index` up to the root, concatenated"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Leaf index {index} out of range for {self.size} leaves")
+
+        siblings = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                siblings.append(level[sibling])
+            index //= 2
+        return b''.join(siblings)
+
+
+def root_from_proof(leaf, index, size, proof):
+    """Recompute the root a leaf's inclusion proof leads to
+
+    Raises ValueError when the proof cannot belong to leaf `index` of a
+    tree of `size` leaves.
+    """
+    if not 0 <= index < size:
+        raise ValueError(f"Leaf index {index} out of range for {size} leaves")
+    if len(proof) % HASH_LENGTH:
+        raise ValueError(f"Proof length must be a multiple of {HASH_LENGTH} bytes")
+
+    node = leaf
+    last = size - 1
+    offset = 0
+    while last > 0:
+        if index % 2:
+            if offset == len(proof):
+                raise ValueError("Proof is too short")
+            node = node_hash(proof[offset:offset + HASH_LENGTH], node)
+            offset += HASH_LENGTH
+        elif index < last:
+            if offset == len(proof):
+                raise ValueError("Proof is too short")
+            node = node_hash(node, proof[offset:offset + HASH_LENGTH])
+            offset += HASH_LENGTH
+        # else: the node has no sibling at this level and moves up unchanged
+        index //= 2
+        last //= 2
+
+    if offset != len(proof):
+        raise ValueError("Proof is too long")
+    return node
+
@@ -0,0 +1,157 @@
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+
+# Latency buckets in seconds, from 100 µs hashing up to slow key generation
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Observations queued before they are sorted into buckets without a scrape
+MAX_PENDING_OBSERVATIONS = 10000
+
+# Shared no-op context manager returned when metrics are disabled
+NULL_TIMER = nullcontext()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs):
+    """Render label pairs as {name="value",...}"""
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager that observes its elapsed time into a histogram"""
+
+    __slots__ = ('_histogram', '_labels', '_start')
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = perf_counter() - self._start
+        histogram = self._histogram
+        # Same as histogram.observe_labels, inlined since this runs on every stage
+        pending = histogram._pending
+        pending.append((self._labels, elapsed))
+        if len(pending) >= histogram.max_pending:
+            histogram._aggregate()
+        return False
+
+
+class Histogram:
+    """Labelled histogram with fixed buckets
+
+    Observations are appended to a queue, which is atomic and needs no lock,
+    and are only sorted into buckets when the histogram is rendered for a
+    scrape, or once the queue reaches `max_pending` so memory stays bounded
+    when nobody scrapes.
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 max_pending=MAX_PENDING_OBSERVATIONS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.max_pending = max_pending
+        self._pending = deque()  # (label values, value) not yet bucketed
+        self._series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record one observation for the given label values"""
+        self.observe_labels(label_values, value)
+
+    def observe_labels(self, label_values, value):
+        """Record one observation for a tuple of label values"""
+        self._pending.append((label_values, value))
+        if len(self._pending) >= self.max_pending:
+            self._aggregate()
+
+    def time(self, *label_values):
+        """Context manager timing a block of code into this histogram"""
+        return _Timer(self, label_values)
+
+    def _aggregate(self):
+        """Move queued observations into their buckets"""
+        pending = self._pending
+        buckets = self.buckets
+        with self._lock:
+            while True:
+                try:
+                    label_values, value = pending.popleft()
+                except IndexError:
+                    break
+                series = self._series.get(label_values)
+                if series is None:
+                    series = self._series[label_values] = [0] * (len(buckets) + 1) + [0.0]
+                series[bisect_left(buckets, value)] += 1
+                series[-1] += value
+
+    def render(self):
+        """Return the histogram in Prometheus text exposition format"""
+        self._aggregate()
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(snapshot.items()):
+            pairs = list(zip(self.labelnames, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(pairs + [('le', _format_number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(pairs) if pairs else ''
+            lines.append(f"{self.name}_sum{labels} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return '\n'.join(lines)
+
+
+class Metrics:
+    """Latency histograms for the API: per stage of each RSA operation and per request"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.stage_seconds = Histogram(
+            'rsa_stage_duration_seconds',
+            'Time spent in each stage of an RSA operation',
+            ('operation', 'stage'), buckets,
+        )
+        self.request_seconds = Histogram(
+            'rsa_http_request_duration_seconds',
+            'HTTP request latency by route and status',
+            ('method', 'route', 'status'), buckets,
+        )
+        self.histograms = [self.stage_seconds, self.request_seconds]
+
+    @classmethod
+    def from_env(cls):
+        """Build metrics unless RSA_METRICS is set to 0"""
+        if os.environ.get('RSA_METRICS', '1') == '0':
+            return None
+        return cls()
+
+    def stage(self, operation, stage):
+        """Context manager timing one stage of an operation"""
+        return _Timer(self.stage_seconds, (operation, stage))
+
+    def render(self):
+        """Return every histogram in Prometheus text exposition format"""
+        return '\n'.join(histogram.render() for histogram in self.histograms) + '\n'
@@ -0,0 +1,92 @@
+"""RSAES-OAEP padding (RFC 8017, section 7.1) with SHA-256 and MGF1
+
+Padding makes each encrypted block randomized and lets the receiver detect
+a block that was not produced for its key, which textbook RSA on raw
+character codes cannot do.
+"""
+import hashlib
+import hmac
+import secrets
+
+HASH_LENGTH = hashlib.sha256().digest_size
+
+
+def mgf1(seed, length):
+    """Mask generation function MGF1 over SHA-256"""
+    output = bytearray()
+    counter = 0
+    while len(output) < length:
+        output += hashlib.sha256(seed + counter.to_bytes(4, 'big')).digest()
+        counter += 1
+    return bytes(output[:length])
+
+
+def _xor(a, b):
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+def max_message_length(key_bytes):
+    """Largest message that fits in one padded block for a modulus of key_bytes bytes"""
+    return key_bytes - 2 * HASH_LENGTH - 2
+
+
+def oaep_encode(message, key_bytes, label=b''):
+    """Pad a message into an encoded block of key_bytes bytes"""
+    capacity = max_message_length(key_bytes)
+    if capacity < 1:
+        raise ValueError(
+            f"Key too small for OAEP padding; need at least {(2 * HASH_LENGTH + 3) * 8} bits"
+        )
+    if len(message) > capacity:
+        raise ValueError(f"Message of {len(message)} bytes exceeds block capacity of {capacity}")
+
+    label_hash = hashlib.sha256(label).digest()
+    padding = bytes(capacity - len(message))
+    data_block = label_hash + padding + b'\x01' + message
+    seed = secrets.token_bytes(HASH_LENGTH)
+
+    masked_data_block = _xor(data_block, mgf1(seed, len(data_block)))
+    masked_seed = _xor(seed, mgf1(masked_data_block, HASH_LENGTH))
+    return b'\x00' + masked_seed + masked_data_block
+
+
+def _is_zero(value):
+    """1 if the byte value is zero, else 0, computed without branching"""
+    return ((value - 1) >> 8) & 1
+
+
+def oaep_decode(block, key_bytes, label=b''):
+    """Remove OAEP padding; raises ValueError for any malformed block
+
+    Every check runs on every block and the results are combined with
+    bitwise arithmetic, so the work done does not depend on which check
+    failed; all failures raise the same error at the end.
+    """
+    if len(block) != key_bytes or max_message_length(key_bytes) < 1:
+        raise ValueError("Decryption error")
+
+    masked_seed = block[1:1 + HASH_LENGTH]
+    masked_data_block = block[1 + HASH_LENGTH:]
+    seed = _xor(masked_seed, mgf1(masked_data_block, HASH_LENGTH))
+    data_block = _xor(masked_data_block, mgf1(seed, len(masked_data_block)))
+
+    label_hash = hashlib.sha256(label).digest()
+    label_ok = int(hmac.compare_digest(data_block[:HASH_LENGTH], label_hash))
+
+    # Scan the whole padding area: the first 0x01 marks the message start and
+    # every byte before it must be zero
+    found = 0
+    separator = 0
+    bad_padding = 0
+    for position in range(HASH_LENGTH, len(data_block)):
+        value = data_block[position]
+        is_one = _is_zero(value ^ 1)
+        first_one = is_one & (found ^ 1)
+        separator |= -first_one & position
+        bad_padding |= (found ^ 1) & (is_one ^ 1) & (_is_zero(value) ^ 1)
+        found |= is_one
+
+    valid = _is_zero(block[0]) & label_ok & found & (bad_padding ^ 1)
+    if not valid:
+        raise ValueError("Decryption error")
+    return data_block[separator + 1:]
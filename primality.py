@@ -0,0 +1,216 @@
+import functools
+import math
+import random
+
+# Deterministic Miller-Rabin witnesses: testing against the first 12 primes
+# gives a correct answer for every n < 3.3 * 10^24, which covers all 64-bit n
+DETERMINISTIC_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+DETERMINISTIC_LIMIT = 1 << 64
+
+# Rounds used for probabilistic testing of large n. Each round lets a
+# composite slip through with probability at most 1/4, so 40 rounds gives
+# an error bound of 2^-80 even for adversarially chosen n
+DEFAULT_ROUNDS = 40
+
+# For randomly chosen candidates the error bound is far better than 1/4 per
+# round, so fewer rounds reach 2^-100 (FIPS 186-4, Appendix C.3)
+RANDOM_CANDIDATE_ROUNDS = (
+    (1536, 3),
+    (1024, 4),
+    (512, 7),
+    (256, 16),
+)
+
+SIEVE_LIMIT = 10000
+
+
+def sieve_primes(limit):
+    """Return all primes below limit using the Sieve of Eratosthenes"""
+    if limit < 3:
+        return []
+    is_candidate = bytearray([1]) * limit
+    is_candidate[0] = is_candidate[1] = 0
+    for i in range(2, int(limit ** 0.5) + 1):
+        if is_candidate[i]:
+            is_candidate[i * i::i] = bytearray(len(range(i * i, limit, i)))
+    return [i for i, flag in enumerate(is_candidate) if flag]
+
+
+SMALL_PRIMES = sieve_primes(SIEVE_LIMIT)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+SMALL_PRIMORIAL = math.prod(SMALL_PRIMES)
+
+
+def has_small_factor(n):
+    """Check whether n is divisible by any of the pre-sieved small primes"""
+    # A single gcd against the product of all small primes is much cheaper
+    # than one Python-level modulo per prime
+    return math.gcd(n, SMALL_PRIMORIAL) != 1
+
+
+def miller_rabin(n, witnesses):
+    """Run the Miller-Rabin test on odd n > 3 for each witness base"""
+    # Write n - 1 as d * 2^s with d odd
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d >>= 1
+        s += 1
+
+    for a in witnesses:
+        a %= n
+        if a in (0, 1, n - 1):
+            continue
+
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+
+        # Square repeatedly looking for n - 1
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def rounds_for_random_candidate(bits):
+    """Return the Miller-Rabin rounds needed for a random candidate of this size"""
+    for min_bits, rounds in RANDOM_CANDIDATE_ROUNDS:
+        if bits >= min_bits:
+            return rounds
+    return DEFAULT_ROUNDS
+
+
+def is_probable_prime(n, rounds=DEFAULT_ROUNDS, rng=random):
+    """Check primality with sieve pre-filtering and Miller-Rabin
+
+    Small n are answered from the sieve, n < 2^64 use a deterministic
+    witness set, and larger n use `rounds` random witnesses. Pass
+    rounds=None when n was drawn at random to pick the round count from
+    its bit length.
+    """
+    if n < 2:
+        return False
+    if n < SIEVE_LIMIT:
+        return n in _SMALL_PRIME_SET
+    if has_small_factor(n):
+        return False
+    if n < SIEVE_LIMIT * SIEVE_LIMIT:
+        # No factor below sqrt(n), so n is prime
+        return True
+
+    if n < DETERMINISTIC_LIMIT:
+        return miller_rabin(n, DETERMINISTIC_WITNESSES)
+
+    if rounds is None:
+        rounds = rounds_for_random_candidate(n.bit_length())
+    witnesses = [rng.randrange(2, n - 1) for _ in range(rounds)]
+    return miller_rabin(n, witnesses)
+
+
+# Bounds on the odd primes used to sieve candidate windows in find_prime.
+# Sieving costs about linear in the bound while the survivors that reach
+# Miller-Rabin only fall like 1/ln(bound), and each Miller-Rabin round
+# costs about bits^3, so larger primes are worth sieving deeper
+SEARCH_SIEVE_MIN = 20000
+SEARCH_SIEVE_MAX = 1 << 21
+SEARCH_WINDOW = 4096
+
+
+def search_sieve_limit(bits):
+    """Sieving bound for a search of this bit length, about bits^2 / 8"""
+    return min(max(bits * bits // 8, SEARCH_SIEVE_MIN), SEARCH_SIEVE_MAX)
+
+
+@functools.lru_cache(maxsize=None)
+def search_primes(limit):
+    """Odd primes below limit, built once per bound"""
+    return tuple(sieve_primes(limit)[1:])
+
+
+class IncrementalPrimeSearch:
+    """Search upward from one random odd start using a residue table
+
+    The residues of the current window start modulo every sieving prime are
+    kept in a table. Each window of SEARCH_WINDOW odd candidates is sieved
+    with slice assignments derived from those residues, and moving to the
+    next window only needs one addition and reduction per prime. Miller-Rabin
+    only runs on candidates that survive the sieve, and goes straight to the
+    witnesses since the sieve already ruled out every small factor.
+    """
+
+    def __init__(self, bits, rng=random, rounds=None):
+        if bits < 2:
+            raise ValueError("Prime bit length must be at least 2")
+        self.bits = bits
+        self.rng = rng
+        self.rounds = rounds_for_random_candidate(bits) if rounds is None else rounds
+        self.low = 1 << (bits - 1)
+        self.high = (1 << bits) - 1
+        # A prime can only be sieved out by itself when it lies in the
+        # candidate range, so only keep primes below the range
+        primes = search_primes(search_sieve_limit(bits))
+        self.primes = primes if primes[-1] < self.low else [p for p in primes if p < self.low]
+        self.candidates_tested = 0
+        self._reset()
+
+    def _reset(self):
+        """Pick a fresh random odd starting point and rebuild residues"""
+        self.start = self.rng.randint(self.low, self.high) | 1
+        self.residues = [self.start % p for p in self.primes]
+
+    def _sieve_window(self):
+        """Mark which of the next SEARCH_WINDOW odd candidates survive"""
+        survivors = bytearray([1]) * SEARCH_WINDOW
+        for p, r in zip(self.primes, self.residues):
+            # Solve start + 2k = 0 (mod p) for the first offset k
+            k = (-r * ((p + 1) >> 1)) % p
+            if k < SEARCH_WINDOW:
+                survivors[k::p] = bytes(len(range(k, SEARCH_WINDOW, p)))
+        return survivors
+
+    def _advance(self):
+        """Move the start to the next window with cheap residue updates"""
+        step = 2 * SEARCH_WINDOW
+        self.start += step
+        self.residues = [(r + step) % p for p, r in zip(self.primes, self.residues)]
+
+    def _is_prime(self, candidate):
+        """Primality test for a sieve survivor"""
+        if candidate < DETERMINISTIC_LIMIT:
+            return is_probable_prime(candidate, self.rounds, self.rng)
+        witnesses = [self.rng.randrange(2, candidate - 1) for _ in range(self.rounds)]
+        return miller_rabin(candidate, witnesses)
+
+    def next_prime(self):
+        """Return the next probable prime at or above the current start
+
+        Each call after the first starts again from a fresh random point,
+        so consecutive primes are independent.
+        """
+        if self.start is None:
+            self._reset()
+        while True:
+            if self.start > self.high:
+                self._reset()
+
+            survivors = self._sieve_window()
+            for k in range(SEARCH_WINDOW):
+                if not survivors[k]:
+                    continue
+                candidate = self.start + 2 * k
+                if candidate > self.high:
+                    break
+                self.candidates_tested += 1
+                if self._is_prime(candidate):
+                    self.start = None
+                    return candidate
+            self._advance()
+
+
+def find_prime(bits, rng=random, rounds=None):
+    """Generate a random probable prime with exactly `bits` bits"""
+    return IncrementalPrimeSearch(bits, rng, rounds).next_prime()
@@ -0,0 +1,82 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class VerificationResultCache:
+    """Bounded LRU cache of signature verification results
+
+    Entries are keyed by (public key fingerprint, SHA-256 hex of the
+    message, signature) and hold the hash recovered from the signature.
+    Because the key fingerprint is part of every entry, a regenerated key
+    never matches old entries; invalidate() also drops them eagerly so they
+    do not take up space until evicted.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self._results = OrderedDict()
+        self._by_fingerprint = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache sized by RSA_VERIFY_RESULT_CACHE_SIZE, or None if unset or 0"""
+        capacity = int(os.environ.get('RSA_VERIFY_RESULT_CACHE_SIZE', 0))
+        return cls(capacity) if capacity > 0 else None
+
+    def get(self, fingerprint, hash_hex, signature):
+        """Return the cached recovered hash, or None on a miss"""
+        key = (fingerprint, hash_hex, signature)
+        with self._lock:
+            decrypted_hash = self._results.get(key)
+            if decrypted_hash is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return decrypted_hash
+
+    def put(self, fingerprint, hash_hex, signature, decrypted_hash):
+        """Remember the hash recovered from a signature"""
+        key = (fingerprint, hash_hex, signature)
+        with self._lock:
+            self._results[key] = decrypted_hash
+            self._results.move_to_end(key)
+            self._by_fingerprint.setdefault(fingerprint, set()).add(key)
+
+            while len(self._results) > self.capacity:
+                old_key, _ = self._results.popitem(last=False)
+                self._forget(old_key)
+                self.evictions += 1
+
+    def _forget(self, key):
+        """Remove a key from the per-fingerprint index (lock held)"""
+        keys = self._by_fingerprint.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_fingerprint[key[0]]
+
+    def invalidate(self, fingerprint):
+        """Drop every cached result for a public key that has been replaced"""
+        with self._lock:
+            for key in self._by_fingerprint.pop(fingerprint, ()):
+                del self._results[key]
+                self.invalidations += 1
+
+    def stats(self):
+        """Return cache size and hit/miss/eviction counts"""
+        with self._lock:
+            return {
+                'size': len(self._results),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
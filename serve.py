@@ -0,0 +1,34 @@
+"""Production launcher for the RSA Digital Signature API
+
+    python serve.py --host 0.0.0.0 --port 5000 --warm-up
+
+Unlike `python app.py`, it runs one interpreter, with no reloader, no
+debugger and no banner, and defaults to production execution mode. Under a
+process manager, point it at the factory instead, for example
+`gunicorn 'app:create_app()'`.
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.environ.get('RSA_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('RSA_PORT', 5000)))
+    parser.add_argument('--warm-up', action='store_true', default=None,
+                        help='fill the key pool and verifier cache in the background '
+                             '(default: RSA_WARM_UP)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('RSA_EXECUTION_MODE', 'production')
+
+    # Imported here so --help stays instant
+    from werkzeug.serving import run_simple
+    from app import create_app
+
+    run_simple(args.host, args.port, create_app(warm=args.warm_up),
+               threaded=True, use_reloader=False, use_debugger=False)
+
+
+if __name__ == '__main__':
+    main()
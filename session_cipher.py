@@ -0,0 +1,68 @@
+"""Authenticated symmetric encryption for hybrid RSA messages
+
+RSA only wraps a short random session key; the payload itself is
+encrypted with that key using AES-256-GCM from the optional `cryptography`
+package. Without it, hybrid encryption is unavailable and every function
+here raises CipherUnavailable. Sealed messages are laid out as
+
+    nonce (12 bytes) | ciphertext | GCM tag (16 bytes)
+
+Every session key encrypts a single message, so random nonces never repeat
+under one key.
+"""
+import secrets
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # cryptography is optional
+    AESGCM = None
+
+KEY_SIZE = 32
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+AVAILABLE = AESGCM is not None
+
+
+class CipherUnavailable(RuntimeError):
+    """Raised when hybrid encryption is used without the cryptography package"""
+
+
+def require():
+    """Raise CipherUnavailable unless the AES-GCM implementation can be loaded"""
+    if not AVAILABLE:
+        raise CipherUnavailable(
+            "Hybrid encryption needs the optional 'cryptography' package "
+            "(pip install cryptography)"
+        )
+
+
+def generate_key():
+    """Return a fresh random session key"""
+    require()
+    return secrets.token_bytes(KEY_SIZE)
+
+
+def encrypt(key, plaintext, associated_data=b''):
+    """Encrypt and authenticate plaintext; returns nonce | ciphertext | tag"""
+    require()
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"Session key must be {KEY_SIZE} bytes")
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, bytes(plaintext), associated_data)
+
+
+def decrypt(key, sealed, associated_data=b''):
+    """Check the tag and decrypt; raises ValueError if the message was altered"""
+    require()
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"Session key must be {KEY_SIZE} bytes")
+    if len(sealed) < NONCE_SIZE + TAG_SIZE:
+        raise ValueError("Sealed message is too short")
+
+    sealed = bytes(sealed)
+    try:
+        return AESGCM(key).decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], associated_data)
+    except InvalidTag:
+        raise ValueError("Message authentication failed") from None
@@ -0,0 +1,167 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from key_store import SQLiteKeyStore
+from tracing import PRODUCTION_MODE
+from verifier_cache import key_fingerprint
+
+# Private keys each worker keeps loaded, least recently used dropped first
+WORKER_KEY_CACHE_SIZE = 4096
+
+# Per-worker state, set up once by _init_worker
+_worker_rsa = None
+_worker_store = None
+_worker_keys = OrderedDict()  # username -> (fingerprint, KeyRecord)
+
+
+class SigningPoolBusy(RuntimeError):
+    """Raised when the signing queue is full; callers should retry later"""
+
+
+class KeyNotLoaded(LookupError):
+    """Raised in a worker that has not seen a key yet and cannot load it itself"""
+
+
+def _init_worker(rsa_class, backend_name, key_store_path):
+    """Create the worker's RSA instance and optional key store connection"""
+    global _worker_rsa, _worker_store
+    _worker_rsa = rsa_class(execution_mode=PRODUCTION_MODE, backend=backend_name)
+    if key_store_path:
+        _worker_store = SQLiteKeyStore(key_store_path)
+
+
+def _load_key(username, fingerprint, key):
+    """Return the worker's copy of a private key, loading it on first use"""
+    entry = _worker_keys.get(username)
+    if entry is not None and entry[0] == fingerprint:
+        _worker_keys.move_to_end(username)
+        return entry
+
+    if key is None and _worker_store is not None:
+        record = _worker_store.get(username)
+        if record is not None and key_fingerprint(record.n, record.e) == fingerprint:
+            key = record
+    if key is None:
+        raise KeyNotLoaded(username)
+
+    entry = (fingerprint, key)
+    _worker_keys[username] = entry
+    while len(_worker_keys) > WORKER_KEY_CACHE_SIZE:
+        _worker_keys.popitem(last=False)
+    return entry
+
+
+def _sign_task(username, fingerprint, hash_int, key=None):
+    """Sign a reduced hash with a key held by this worker"""
+    _, key = _load_key(username, fingerprint, key)
+    return _worker_rsa.private_key_op(hash_int, key)
+
+
+def _recover_task(n, e, signature):
+    """Apply a public key to a signature"""
+    return _worker_rsa.verifier_cache.get(n, e).recover(signature)
+
+
+class SigningPool:
+    """Process pool that runs private and public key operations on all cores
+
+    Tasks carry only the username, key fingerprint and hash. Each worker
+    keeps the private keys it has used, so a key crosses the process
+    boundary at most once per worker. With a SQLite key store the worker
+    loads it from the database itself. Otherwise the first task for a key
+    in a given worker fails with KeyNotLoaded and is resent once with the
+    key attached.
+
+    At most `max_pending` tasks may be queued or running. Beyond that,
+    submissions raise SigningPoolBusy instead of letting the queue grow
+    without bound.
+    """
+
+    def __init__(self, rsa_class, max_workers=None, max_pending=None,
+                 backend_name=None, key_store_path=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 64
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(rsa_class, backend_name, key_store_path),
+        )
+
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.key_transfers = 0
+
+    @classmethod
+    def from_env(cls, rsa_class, backend_name=None):
+        """Build a pool from RSA_SIGNING_WORKERS, or None when it is unset or 0"""
+        workers = int(os.environ.get('RSA_SIGNING_WORKERS', 0))
+        if workers <= 0:
+            return None
+        max_pending = os.environ.get('RSA_SIGNING_MAX_PENDING')
+        return cls(
+            rsa_class,
+            max_workers=workers,
+            max_pending=int(max_pending) if max_pending else None,
+            backend_name=backend_name,
+            key_store_path=os.environ.get('RSA_KEY_STORE_PATH'),
+        )
+
+    def _submit(self, func, *args):
+        """Queue a task if there is room, releasing its slot when it finishes"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise SigningPoolBusy(f"Signing queue is full ({self.max_pending} pending)")
+
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def sign(self, username, key, hash_int):
+        """Sign a reduced hash with a KeyRecord in a worker; returns (signature, used_crt)"""
+        fingerprint = key_fingerprint(key.n, key.e)
+        try:
+            return self._submit(_sign_task, username, fingerprint, hash_int).result()
+        except KeyNotLoaded:
+            with self._lock:
+                self.key_transfers += 1
+            return self._submit(
+                _sign_task, username, fingerprint, hash_int, key
+            ).result()
+
+    def recover(self, n, e, signature):
+        """Compute signature^e mod n in a worker"""
+        return self._submit(_recover_task, n, e, signature).result()
+
+    def stats(self):
+        """Return worker count, queue depth and task counters"""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'key_transfers': self.key_transfers,
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
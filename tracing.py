@@ -0,0 +1,44 @@
+import os
+
+DEMO_MODE = 'demo'
+PRODUCTION_MODE = 'production'
+EXECUTION_MODES = (DEMO_MODE, PRODUCTION_MODE)
+
+
+def execution_mode_from_env():
+    """Read the execution mode from RSA_EXECUTION_MODE (defaults to demo)"""
+    mode = os.environ.get('RSA_EXECUTION_MODE', DEMO_MODE).lower()
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"RSA_EXECUTION_MODE must be one of {', '.join(EXECUTION_MODES)}")
+    return mode
+
+
+class Trace:
+    """Structured collector for the step-by-step explanation of one operation
+
+    Callers only build trace messages when a trace is present:
+
+        if trace:
+            trace.step(f"n = {n}")
+
+    so with tracing off no integers are ever formatted. With `echo` set,
+    each step is also printed as it is recorded, which is how the demo
+    console output is produced.
+    """
+
+    def __init__(self, echo=False):
+        self.echo = echo
+        self.stage = None
+        self.steps = []
+
+    def begin(self, stage):
+        """Start a new stage; later steps are recorded under it"""
+        self.stage = stage
+        if self.echo:
+            print(f"=== {stage} ===")
+
+    def step(self, message):
+        """Record one step of the current stage"""
+        self.steps.append({'stage': self.stage, 'message': message})
+        if self.echo:
+            print(message)
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import gmpy2
+except ImportError:  # gmpy2 is optional
+    gmpy2 = None
+
+
+def key_fingerprint(n, e):
+    """SHA-256 fingerprint of a public key, as hex"""
+    n_bytes = n.to_bytes((n.bit_length() + 7) // 8 or 1, 'big')
+    e_bytes = e.to_bytes((e.bit_length() + 7) // 8 or 1, 'big')
+    return hashlib.sha256(
+        len(n_bytes).to_bytes(4, 'big') + n_bytes + e_bytes
+    ).hexdigest()
+
+
+class PublicKeyVerifier:
+    """A parsed public key with the per-key state verification needs
+
+    Holds the key size used for range checks and hash reduction, the key
+    fingerprint that keys the verification result cache, and the modulus
+    and exponent in the arithmetic backend's native form (gmpy2 mpz values
+    when the gmpy2 backend is in use).
+
+    This does not make verification faster with the native backend: the
+    exponentiation is the whole cost and cannot be cached, and the lookup
+    costs about as much as rebuilding this state. Montgomery constants are
+    not cached either; a Montgomery ladder written in Python measured about
+    twice as slow as the built-in pow.
+    """
+
+    __slots__ = ('n', 'e', 'bit_length', 'byte_length', 'fingerprint',
+                 '_backend', '_n', '_e')
+
+    def __init__(self, n, e, backend):
+        self.n = n
+        self.e = e
+        self.bit_length = n.bit_length()
+        self.byte_length = (self.bit_length + 7) // 8
+        self.fingerprint = key_fingerprint(n, e)
+        self._backend = backend
+
+        if backend.name == 'gmpy2' and gmpy2 is not None:
+            self._n = gmpy2.mpz(n)
+            self._e = gmpy2.mpz(e)
+        else:
+            self._n = n
+            self._e = e
+
+    def reduce_hash(self, hash_int):
+        """Reduce a hash integer below n (a no-op when the hash is shorter than n)"""
+        if hash_int.bit_length() < self.bit_length:
+            return hash_int
+        return hash_int % self.n
+
+    def recover(self, signature):
+        """Apply the public key to a signature: signature^e mod n"""
+        return self._backend.power_mod(signature, self._e, self._n)
+
+    def verify(self, hash_int, signature):
+        """Check a signature against a (not yet reduced) hash integer"""
+        return self.recover(signature) == self.reduce_hash(hash_int)
+
+    def screen(self, hashes, signatures):
+        """Check a batch with one exponentiation: (s1*s2*...)^e == h1*h2*... mod n
+
+        `hashes` must already be reduced. Passing is a screening result: it
+        shows every message was signed with this key, but two signatures
+        altered so their changes cancel out in the product pass together.
+        Use verify when the exact signature values matter.
+        """
+        n = self._n
+        signature_product = 1
+        for signature in signatures:
+            signature_product = signature_product * signature % n
+        hash_product = 1
+        for hash_int in hashes:
+            hash_product = hash_product * hash_int % n
+        return self._backend.power_mod(signature_product, self._e, n) == hash_product
+
+    def find_invalid(self, hashes, signatures):
+        """Indices of the pairs that fail, found by screening halves of the batch
+
+        A clean batch costs one screen. Otherwise products of both sides
+        are kept in a binary tree (one multiplication per node, about twice
+        the batch in memory), and the search descends from the root with
+        one exponentiation per node checked: when the left child of a
+        failing node passes, the right child must fail and is not checked.
+        k bad pairs among N cost about 2k*log2(N) exponentiations.
+        """
+        if self.screen(hashes, signatures):
+            return []
+
+        n = self._n
+        signature_levels = [[signature % n for signature in signatures]]
+        hash_levels = [list(hashes)]
+        while len(signature_levels[-1]) > 1:
+            signature_levels.append(self._pair_products(signature_levels[-1]))
+            hash_levels.append(self._pair_products(hash_levels[-1]))
+
+        invalid = []
+        # (level, position) of nodes known to fail, starting from the root
+        failing = [(len(signature_levels) - 1, 0)]
+        while failing:
+            level, position = failing.pop()
+            if level == 0:
+                invalid.append(position)
+                continue
+            left, right = 2 * position, 2 * position + 1
+            below = level - 1
+            if right == len(signature_levels[below]):
+                # An unpaired node moved up unchanged
+                failing.append((below, left))
+                continue
+            left_passes = (self._backend.power_mod(signature_levels[below][left], self._e, n)
+                           == hash_levels[below][left])
+            if left_passes:
+                failing.append((below, right))
+                continue
+            failing.append((below, left))
+            right_passes = (self._backend.power_mod(signature_levels[below][right], self._e, n)
+                            == hash_levels[below][right])
+            if not right_passes:
+                failing.append((below, right))
+        return sorted(invalid)
+
+    def _pair_products(self, values):
+        """Multiply neighbouring values mod n; an unpaired last value moves up unchanged"""
+        n = self._n
+        products = [values[i] * values[i + 1] % n for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            products.append(values[-1])
+        return products
+
+
+class VerifierCache:
+    """LRU cache of PublicKeyVerifier objects keyed by (n, e)
+
+    Gives every verification of a key the same fingerprint and, under
+    gmpy2, the same converted integers, and counts which keys are in use.
+    """
+
+    def __init__(self, backend, capacity=1024):
+        self.backend = backend
+        self.capacity = capacity
+        self._verifiers = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, n, e):
+        """Return the verifier for (n, e), building and caching it on a miss"""
+        key = (n, e)
+        with self._lock:
+            verifier = self._verifiers.get(key)
+            if verifier is not None:
+                self._verifiers.move_to_end(key)
+                self.hits += 1
+                return verifier
+            self.misses += 1
+
+        verifier = PublicKeyVerifier(n, e, self.backend)
+        with self._lock:
+            self._verifiers[key] = verifier
+            self._verifiers.move_to_end(key)
+            while len(self._verifiers) > self.capacity:
+                self._verifiers.popitem(last=False)
+                self.evictions += 1
+        return verifier
+
+    def invalidate(self, n, e):
+        """Drop the verifier for a key that has been replaced"""
+        with self._lock:
+            if self._verifiers.pop((n, e), None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        """Return cache size and hit/miss/eviction counts"""
+        with self._lock:
+            return {
+                'size': len(self._verifiers),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,147 @@
+"""Compact length-prefixed binary encoding for API requests and responses
+
+A message is a sequence of named fields, each laid out as
+
+    name length (1 byte) | name (ASCII) | type (1 byte) | value length (4 bytes) | value
+
+with lengths big-endian. Value types:
+
+    b  raw bytes
+    s  UTF-8 text
+    i  unsigned integer, big-endian with no leading zero bytes
+    ?  boolean, one byte 0 or 1
+    m  nested message
+    l  list of nested messages, each prefixed with its 4-byte length
+    a  list of any values, each laid out as type (1 byte) | value length
+       (4 bytes) | value
+
+Lists made only of dicts use l; any other list, such as a list of strings,
+uses a.
+
+Integers such as signatures therefore travel as their raw big-endian bytes
+and are never converted to or from decimal text.
+"""
+import struct
+
+MEDIA_TYPE = 'application/x-rsa-binary'
+
+_FIELD_HEADER = struct.Struct('>cI')
+_LENGTH = struct.Struct('>I')
+
+
+class WireFormatError(ValueError):
+    """Raised when a binary message is malformed or holds an unsupported value"""
+
+
+def _encode_value(value):
+    """Return (type tag, encoded bytes) for one value"""
+    # bool is checked before int because it is an int subclass
+    if isinstance(value, bool):
+        return b'?', b'\x01' if value else b'\x00'
+    if isinstance(value, int):
+        if value < 0:
+            raise WireFormatError("Negative integers are not supported")
+        return b'i', value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    if isinstance(value, (bytes, bytearray)):
+        return b'b', bytes(value)
+    if isinstance(value, str):
+        return b's', value.encode('utf-8')
+    if isinstance(value, dict):
+        return b'm', encode_message(value)
+    if isinstance(value, list):
+        parts = []
+        if all(isinstance(item, dict) for item in value):
+            for item in value:
+                encoded = encode_message(item)
+                parts.append(_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+            return b'l', b''.join(parts)
+        for item in value:
+            if item is None:
+                raise WireFormatError("Lists cannot hold None")
+            tag, encoded = _encode_value(item)
+            parts.append(_FIELD_HEADER.pack(tag, len(encoded)))
+            parts.append(encoded)
+        return b'a', b''.join(parts)
+    raise WireFormatError(f"Cannot encode value of type {type(value).__name__}")
+
+
+def encode_message(fields):
+    """Encode a dict with string keys; None values are left out"""
+    if not isinstance(fields, dict):
+        raise WireFormatError("Only dicts can be encoded as messages")
+
+    parts = []
+    for name, value in fields.items():
+        if value is None:
+            continue
+        name_bytes = name.encode('ascii')
+        if len(name_bytes) > 255:
+            raise WireFormatError(f"Field name too long: {name}")
+        tag, encoded = _encode_value(value)
+        parts.append(bytes((len(name_bytes),)))
+        parts.append(name_bytes)
+        parts.append(_FIELD_HEADER.pack(tag, len(encoded)))
+        parts.append(encoded)
+    return b''.join(parts)
+
+
+def _decode_value(tag, data):
+    if tag == b'b':
+        return data
+    if tag == b's':
+        return data.decode('utf-8')
+    if tag == b'i':
+        return int.from_bytes(data, 'big')
+    if tag == b'?':
+        return data != b'\x00'
+    if tag == b'm':
+        return decode_message(data)
+    if tag == b'l':
+        items = []
+        offset = 0
+        while offset < len(data):
+            if offset + _LENGTH.size > len(data):
+                raise WireFormatError("Truncated list item length")
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if offset + length > len(data):
+                raise WireFormatError("Truncated list item")
+            items.append(decode_message(data[offset:offset + length]))
+            offset += length
+        return items
+    if tag == b'a':
+        items = []
+        offset = 0
+        while offset < len(data):
+            if offset + _FIELD_HEADER.size > len(data):
+                raise WireFormatError("Truncated list item header")
+            item_tag, length = _FIELD_HEADER.unpack_from(data, offset)
+            offset += _FIELD_HEADER.size
+            if offset + length > len(data):
+                raise WireFormatError("Truncated list item")
+            items.append(_decode_value(item_tag, data[offset:offset + length]))
+            offset += length
+        return items
+    raise WireFormatError(f"Unknown value type {tag!r}")
+
+
+def decode_message(data):
+    """Decode bytes produced by encode_message back into a dict"""
+    data = bytes(data)
+    fields = {}
+    offset = 0
+    while offset < len(data):
+        name_length = data[offset]
+        offset += 1
+        name_end = offset + name_length
+        if name_end + _FIELD_HEADER.size > len(data):
+            raise WireFormatError("Truncated field header")
+        name = data[offset:name_end].decode('ascii')
+        tag, length = _FIELD_HEADER.unpack_from(data, name_end)
+        offset = name_end + _FIELD_HEADER.size
+        if offset + length > len(data):
+            raise WireFormatError(f"Truncated value for field {name}")
+        fields[name] = _decode_value(tag, data[offset:offset + length])
+        offset += length
+    return fields